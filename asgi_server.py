@@ -0,0 +1,136 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
+# quart imports for asynchronous server implementation
+from quart import Quart, request, jsonify
+
+# pymongo imports for mongodb error handling
+from pymongo.errors import ServerSelectionTimeoutError, OperationFailure
+
+# fastjsonschema import for json schema validation error handling
+import fastjsonschema
+
+from mars.scheduler import DependenceCycleError
+
+# the http_server module reads the configuration, connects to mongodb
+# and holds the catalog state shared by the two serving modes
+# (validators, sequence cache, in memory catalog, closures index)
+# and the request flows, this module only runs their steps
+import http_server as core
+
+# instanciate quart server
+server = Quart(__name__)
+
+# pymongo is synchronous : the database requests are offloaded
+# in a thread pool to keep the event loop free
+io_executor = ThreadPoolExecutor(
+    max_workers=core.server_config.get('asgi.ioWorkers', 8),
+    thread_name_prefix='mars-io')
+
+# the process tree building and sequence generation are cpu bound,
+# they run in a dedicated pool so they never block the event loop
+cpu_executor = ThreadPoolExecutor(
+    max_workers=core.server_config.get('asgi.cpuWorkers', 2),
+    thread_name_prefix='mars-cpu')
+
+
+async def send_flow_response(flow):
+    # run the steps of a request flow in the thread pools, the database
+    # requests in the io pool and the processing in the cpu pool,
+    # and send the response
+    loop = asyncio.get_running_loop()
+    try:
+        step = next(flow)
+        while True:
+            pool, function, args = step
+            executor = io_executor if pool == core.IO_STEP else cpu_executor
+            result = await loop.run_in_executor(executor, function, *args)
+            step = flow.send(result)
+    except StopIteration as stop:
+        data, mimetype, headers = stop.value
+
+    if mimetype == core.NDJSON_MIMETYPE:
+        data = stream_lines(data)
+    return server.response_class(data, mimetype=mimetype,
+                                 headers=headers), 200
+
+
+async def stream_lines(lines):
+    # generate the response lines in the cpu pool,
+    # by chunk to limit the thread switches
+    loop = asyncio.get_running_loop()
+    while True:
+        chunk = await loop.run_in_executor(cpu_executor,
+                                           lambda: list(islice(lines, 32)))
+        if not chunk:
+            break
+        yield ''.join(chunk).encode('utf-8')
+
+
+# ressource not found error handling
+@server.errorhandler(404)
+async def errorHandler(error):
+    return jsonify(status='FAIL', error=str(error)), 404
+
+
+@server.errorhandler(400)
+async def badRequestErrorHandler(error):
+    return jsonify(status='FAIL', error=str(error)), 400
+
+
+# jsonschema error handling
+@server.errorhandler(fastjsonschema.JsonSchemaException)
+async def processingErrorHandler(error):
+    return jsonify(status='FAIL', error=str(error)), 407
+
+
+# catalog dependences cycle error handling
+@server.errorhandler(DependenceCycleError)
+async def dependenceCycleErrorHandler(error: DependenceCycleError):
+    return jsonify(status='FAIL', error=str(error), cycle=error.cycle), 409
+
+
+# mongodb error handling
+@server.errorhandler(ServerSelectionTimeoutError)
+@server.errorhandler(OperationFailure)
+async def mongodbErrorHandler(error: Exception):
+    return jsonify(status='FAIL', error=str(error))
+
+
+# sequence/move ressource handler
+@server.route("/sequence/move", methods=['GET'])
+async def seqMoveHandler():
+    # get the request body
+    body = await request.get_json()
+    return await send_flow_response(core.sequence_request_flow(request, body))
+
+
+# sequence/move/batch ressource handler
+@server.route("/sequence/move/batch", methods=['GET'])
+async def seqMoveBatchHandler():
+    # get the request body, a list of sequence requests
+    body = await request.get_json()
+    return await send_flow_response(core.batch_request_flow(request, body))
+
+
+# prometheus metrics ressource handler
+@server.route('/metrics', methods=['GET'])
+async def metricsHandler():
+    return server.response_class(core.metrics.render(),
+                                 content_type=core.METRICS_CONTENT_TYPE), 200
+
+
+# server statistics ressource handler
+@server.route('/stats', methods=['GET'])
+async def statsHandler():
+    return jsonify(status='SUCCESS', **core.get_stats()), 200
+
+
+@server.route('/', methods=['GET'])
+async def baseHandler():
+    return "ok"
+
+
+if __name__ == '__main__':
+    server.run(host=core.server_host, port=core.server_port)
@@ -0,0 +1,120 @@
+""" benchmark of the process tree building and traversal
+    with the compact ActionTree and the treelib based one,
+    on the C35 catalog replicated to get 10k to 100k nodes trees
+
+    usage : python -m benchmarks.action_tree
+"""
+import gc
+import time
+import tracemalloc
+
+from mars.action import Action
+from mars import actiontreelib
+from benchmarks.c35 import (GLOBAL_ACTION_IDS, full_product_query,
+                            replicate_c35_documents)
+from mars.catalog import ActionCatalog
+
+try:
+    from benchmarks.legacy import actiontreelib as legacy_actiontreelib
+except ImportError:
+    # treelib not installed
+    legacy_actiontreelib = None
+
+# catalog copies, about 350 nodes per copy
+COPIES = [30, 100, 300]
+
+
+def build_tree(module, actions, go_load_tool_pos, go_home):
+    # same operations as http_server.build_process_tree
+    tree = module.ActionTree()
+    for a in actions:
+        tree.add_branch_for_action(a)
+
+    lul_action_types = ['LOAD.EFFECTOR', 'UNLOAD.EFFECTOR']
+    load_unload_nodes = list(tree.filter_nodes(
+        lambda node: node.action_type in lul_action_types))
+    for lul_node in load_unload_nodes:
+        load_tool_node = module.ActionNode(go_load_tool_pos, is_global=True)
+        tree.add_action_node(load_tool_node,
+                             parent=tree.parent(lul_node.identifier))
+        tree.move_node(lul_node.identifier, load_tool_node.identifier)
+
+    root_node = tree.get_node(0)
+    root_children = tree.children(0)
+    go_home_node = module.ActionNode(go_home, is_global=True)
+    tree.add_action_node(go_home_node, parent=root_node)
+    for ch in root_children:
+        tree.move_node(ch.identifier, go_home_node.identifier)
+    tree.add_action_node(module.ActionNode(go_home, is_global=True),
+                         parent=root_node)
+    return tree
+
+
+def traverse(tree):
+    expanded = tree.expand_tree(
+        key=lambda node: node.sort_key if node.sort_key else 9999)
+    return [tree.get_node(nid).data for nid in expanded]
+
+
+def measure(module, actions, go_load_tool_pos, go_home):
+    gc.collect()
+    start = time.perf_counter()
+    tree = build_tree(module, actions, go_load_tool_pos, go_home)
+    build_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    order = traverse(tree)
+    traverse_time = time.perf_counter() - start
+
+    del tree
+    gc.collect()
+    tracemalloc.start()
+    tree = build_tree(module, actions, go_load_tool_pos, go_home)
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    return len(tree), build_time, traverse_time, memory, order
+
+
+def main():
+    modules = [('compact', actiontreelib)]
+    if legacy_actiontreelib is not None:
+        modules.append(('treelib', legacy_actiontreelib))
+    else:
+        print('treelib not installed, compact ActionTree only')
+
+    print('{tree:<9}{nodes:>8}{build:>12}{traverse:>14}{memory:>12}'
+          .format(tree='tree', nodes='nodes', build='build (ms)',
+                  traverse='traverse (ms)', memory='memory (MB)'))
+
+    for copies in COPIES:
+        catalog = ActionCatalog(replicate_c35_documents(copies))
+        root_actions, dependences, global_actions = catalog.extract_actions(
+            full_product_query(), GLOBAL_ACTION_IDS)
+        identity_map = {}
+        actions = [Action.parse(ra, dependences, identity_map)
+                   for ra in root_actions]
+        go_load_tool_pos = Action.parse(
+            global_actions['load_tool_position'], dependences, identity_map)
+        go_home = Action.parse(global_actions['home'],
+                               dependences, identity_map)
+
+        orders = []
+        for name, module in modules:
+            nodes, build_time, traverse_time, memory, order = measure(
+                module, actions, go_load_tool_pos, go_home)
+            orders.append([a.id if a else None for a in order])
+            print('{tree:<9}{nodes:>8}{build:>12.1f}{traverse:>14.1f}'
+                  '{memory:>12.2f}'
+                  .format(tree=name, nodes=nodes,
+                          build=build_time * 1000,
+                          traverse=traverse_time * 1000,
+                          memory=memory / 2**20))
+
+        # the global nodes ids differ, compare the actions order
+        if len(orders) > 1 and orders[0] != orders[1]:
+            print('the traversal orders differ')
+
+
+if __name__ == '__main__':
+    main()
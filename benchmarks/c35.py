@@ -0,0 +1,70 @@
+import pathlib
+from typing import Dict, List
+
+from bson import json_util
+
+from mars.catalog import ActionCatalog
+
+# C35 action catalog export, one document per line
+C35_ACTIONS_PATH = pathlib.Path(__file__).parent.parent\
+    .joinpath('ressources_c35_actions.json')
+
+GLOBAL_ACTION_IDS = ['home', 'load_tool_position']
+
+
+def load_c35_documents() -> List[Dict]:
+    """ read the C35 action catalog export
+
+    Returns:
+        List[Dict]: the catalog documents
+    """
+    with open(C35_ACTIONS_PATH, 'r') as cfile:
+        return [json_util.loads(line) for line in cfile if line.strip()]
+
+
+def replicate_c35_documents(copies: int) -> List[Dict]:
+    """ replicate the C35 action catalog, as for several products,
+        the global actions are not replicated
+
+    Args:
+        copies (int): number of catalog copies
+
+    Returns:
+        List[Dict]: the catalog documents, the _id of each copied action
+            suffixed with the copy number
+    """
+    documents = load_c35_documents()
+    replicated = [doc for doc in documents
+                  if doc['_id'] in GLOBAL_ACTION_IDS]
+    for copy in range(copies):
+        for doc in documents:
+            if doc['_id'] in GLOBAL_ACTION_IDS:
+                continue
+            rdoc = dict(doc)
+            rdoc['_id'] = '{id}_{copy}'.format(id=doc['_id'], copy=copy)
+            rdoc['dependences'] = [
+                dict(dep, action='{id}_{copy}'.format(id=dep['action'],
+                                                      copy=copy))
+                for dep in doc.get('dependences', [])]
+            replicated.append(rdoc)
+    return replicated
+
+
+def load_c35_catalog() -> ActionCatalog:
+    """ load the C35 action catalog in memory
+
+    Returns:
+        ActionCatalog: the in memory catalog
+    """
+    return ActionCatalog(load_c35_documents())
+
+
+def full_product_query() -> Dict:
+    """ get the query selecting the work on all the C35 fasteners
+
+    Returns:
+        Dict: the $match query
+    """
+    return {'$or': [{'type': 'MOVE.ARM.WORK',
+                     'product_reference.designation': 'fastener'},
+                    {'_id': {'$in': GLOBAL_ACTION_IDS}}]}
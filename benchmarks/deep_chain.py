@@ -0,0 +1,121 @@
+""" validation and benchmark of the parsing and process tree building
+    on synthetic dependence chains deeper than the recursion limit :
+    work -> approach -> clearance -> work ... -> C35 approach -> station,
+    effector load...
+    built from the C35 actions definitions
+
+    usage : python -m benchmarks.deep_chain
+"""
+import sys
+import time
+from typing import Dict, List, Tuple
+
+from mars.action import Action
+from mars.actiontreelib import ActionTree
+from mars.scheduler import DependenceScheduler
+from benchmarks.c35 import GLOBAL_ACTION_IDS, load_c35_documents
+
+# number of actions in the chains
+DEPTHS = [1000, 10000, 50000]
+
+# types of the chain actions, repeated
+CHAIN_TYPES = ['MOVE.ARM.WORK', 'MOVE.ARM.APPROACH', 'MOVE.ARM.CLEARANCE']
+
+
+def chain_documents(depth: int) -> Tuple[Dict, Dict[str, Dict],
+                                         Dict[str, Dict]]:
+    """ build a chain of actions, each one depending on the next one
+
+    Args:
+        depth (int): number of actions in the chain
+
+    Returns:
+        Tuple: the root action, the dependences indexed by str(_id)
+            and the global actions, as extracted from the catalog
+    """
+    documents = load_c35_documents()
+    by_id = {str(doc['_id']): doc for doc in documents}
+    templates = {}
+    for doc in documents:
+        templates.setdefault(doc['type'], doc)
+
+    # the chain ends on a C35 approach and its dependences
+    approach = templates['MOVE.ARM.APPROACH']
+    dependences = {}
+    stack = [approach]
+    while stack:
+        doc = stack.pop()
+        dependences[str(doc['_id'])] = doc
+        stack.extend(by_id[str(dep['action'])]
+                     for dep in doc['dependences']
+                     if str(dep['action']) not in dependences)
+
+    next_id = approach['_id']
+    chain: List[Dict] = []
+    for index in reversed(range(depth)):
+        template = templates[CHAIN_TYPES[index % len(CHAIN_TYPES)]]
+        doc = dict(template,
+                   _id='chain_{index}'.format(index=index),
+                   dependences=[{'action': next_id, 'type': 'UPSTREAM'}])
+        doc.pop('work_order', None)
+        chain.append(doc)
+        next_id = doc['_id']
+
+    root = chain.pop()
+    dependences.update((doc['_id'], doc) for doc in chain)
+    global_actions = {doc['_id']: doc for doc in documents
+                      if doc['_id'] in GLOBAL_ACTION_IDS}
+    return root, dependences, global_actions
+
+
+def main():
+    print('recursion limit {limit}'.format(limit=sys.getrecursionlimit()))
+    print('{depth:>8}{parse:>13}{schedule:>16}{build:>13}{traverse:>16}'
+          .format(depth='depth', parse='parse (ms)',
+                  schedule='schedule (ms)', build='build (ms)',
+                  traverse='traverse (ms)'))
+
+    for depth in DEPTHS:
+        root, dependences, global_actions = chain_documents(depth)
+
+        start = time.perf_counter()
+        identity_map = {}
+        action = Action.parse(root, dependences, identity_map)
+        go_load_tool_pos = Action.parse(
+            global_actions['load_tool_position'], dependences, identity_map)
+        go_home = Action.parse(global_actions['home'],
+                               dependences, identity_map)
+        parse_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        closure = DependenceScheduler().schedule(action)
+        schedule_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        tree = ActionTree()
+        tree.add_branches([action])
+        tree.insert_global_actions(go_load_tool_pos, go_home)
+        build_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        sequence = list(tree.iter_actions())
+        traverse_time = time.perf_counter() - start
+
+        # the chain and the C35 approach closure, with the global actions
+        assert len(closure) == len(dependences) + 1, \
+            'the closure misses actions'
+        assert len([a for a in sequence
+                    if a.id not in GLOBAL_ACTION_IDS]) == len(closure), \
+            'the sequence misses actions'
+
+        print('{depth:>8}{parse:>13.1f}{schedule:>16.1f}{build:>13.1f}'
+              '{traverse:>16.1f}'
+              .format(depth=depth,
+                      parse=parse_time * 1000,
+                      schedule=schedule_time * 1000,
+                      build=build_time * 1000,
+                      traverse=traverse_time * 1000))
+
+
+if __name__ == '__main__':
+    main()
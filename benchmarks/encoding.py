@@ -0,0 +1,83 @@
+""" comparison of the /sequence/move response encodings, json as
+    encoded by the servers against the binary encodings, on the full
+    rails sequences of the C35 catalog and of synthetic catalogs :
+    encoded size and encoding time
+
+    the binary encodings whose package is not installed are skipped
+
+    usage : python -m benchmarks.encoding
+"""
+import json
+import time
+from typing import Callable, Dict, List, Tuple
+
+from mars.catalog import ActionCatalog
+from mars.description import describe_sequence
+from mars.encoding import BINARY_ENCODERS, JSON_MIMETYPE
+from benchmarks.c35 import (GLOBAL_ACTION_IDS, full_product_query,
+                            load_c35_catalog)
+from benchmarks.pipeline import build_process_tree
+from benchmarks.synthetic import generate_catalog
+
+# synthetic catalogs rails, all the fasteners of the rails being worked
+RAILS = [2, 10, 50]
+FASTENERS_PER_RAIL = 50
+REPEAT = 5
+
+
+def encode_json(result: Dict) -> bytes:
+    # as the servers : sorted keys, compact separators, utf-8
+    return json.dumps(result, sort_keys=True,
+                      separators=(',', ':')).encode('utf-8')
+
+
+def encoders() -> List[Tuple[str, Callable[[Dict], bytes]]]:
+    return [(JSON_MIMETYPE, encode_json)] + list(BINARY_ENCODERS.items())
+
+
+def generate_result(catalog: ActionCatalog) -> Dict:
+    # response body of a request on all the fasteners, without options
+    actions = catalog.extract_actions(full_product_query(), GLOBAL_ACTION_IDS)
+    process_tree = build_process_tree(*actions)
+    sequence = [a.get_sequence() for a in process_tree.iter_actions()]
+    return {"status": 'SUCCESS',
+            "sequence": sequence,
+            "processTree": describe_sequence(sequence)}
+
+
+def best_time(encoder: Callable[[Dict], bytes], result: Dict) -> float:
+    times = []
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        encoder(result)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    catalogs = [('C35', load_c35_catalog())]
+    catalogs += [('{rails} rails'.format(rails=rails),
+                  ActionCatalog(generate_catalog(rails, FASTENERS_PER_RAIL)))
+                 for rails in RAILS]
+
+    print('{encoding:>22}{size:>12}{ratio:>10}{time:>12}'
+          .format(encoding='encoding', size='size (kB)', ratio='/ json',
+                  time='time (ms)'))
+    for name, catalog in catalogs:
+        result = generate_result(catalog)
+        print('{name}, {count} actions'
+              .format(name=name, count=len(result['sequence'])))
+
+        json_size = None
+        for mimetype, encoder in encoders():
+            size = len(encoder(result))
+            if json_size is None:
+                json_size = size
+            print('{encoding:>22}{size:>12.1f}{ratio:>10.2f}{time:>12.2f}'
+                  .format(encoding=mimetype, size=size / 1000,
+                          ratio=size / json_size,
+                          time=best_time(encoder, result) * 1000))
+
+
+if __name__ == '__main__':
+    main()
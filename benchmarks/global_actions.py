@@ -0,0 +1,83 @@
+""" benchmark of the global actions insertion (go load tool position
+    before the effector changes, go home and return home) in the process
+    tree, single pass ActionTree.insert_global_actions against the
+    previous build_process_tree code, on 10k to 100k nodes trees
+
+    usage : python -m benchmarks.global_actions
+"""
+import time
+
+from mars.action import Action
+from mars.actiontreelib import ActionTree
+from mars.catalog import ActionCatalog
+from benchmarks.c35 import (GLOBAL_ACTION_IDS, full_product_query,
+                            replicate_c35_documents)
+from benchmarks.legacy import global_actions as legacy
+
+# catalog copies, about 350 nodes per copy
+COPIES = [30, 100, 300]
+REPEAT = 5
+
+
+def shape(tree: ActionTree):
+    # children in insertion order with their depth, the global nodes
+    # identifiers differ between two trees so the actions ids are used
+    expanded = tree.expand_tree(key=lambda node: 0)
+    depths = {}
+    result = []
+    for nid in expanded:
+        node = tree.get_node(nid)
+        parent = tree.parent(nid)
+        depths[nid] = depths[parent.identifier] + 1 if parent else 0
+        result.append((depths[nid], node.data.id if node.data else None))
+    return result
+
+
+def measure(insert, actions, go_load_tool_pos, go_home):
+    times = []
+    for _ in range(REPEAT):
+        tree = ActionTree()
+        tree.add_branches(actions)
+        start = time.perf_counter()
+        insert(tree, go_load_tool_pos, go_home)
+        times.append(time.perf_counter() - start)
+    return min(times), tree
+
+
+def main():
+    print('{nodes:>8}{effectors:>11}{legacy:>14}{single:>18}'
+          .format(nodes='nodes', effectors='effectors',
+                  legacy='legacy (ms)', single='single pass (ms)'))
+
+    for copies in COPIES:
+        catalog = ActionCatalog(replicate_c35_documents(copies))
+        root_actions, dependences, global_actions = catalog.extract_actions(
+            full_product_query(), GLOBAL_ACTION_IDS)
+        identity_map = {}
+        actions = [Action.parse(ra, dependences, identity_map)
+                   for ra in root_actions]
+        go_load_tool_pos = Action.parse(
+            global_actions['load_tool_position'], dependences, identity_map)
+        go_home = Action.parse(global_actions['home'],
+                               dependences, identity_map)
+
+        legacy_time, legacy_tree = measure(legacy.insert_global_actions,
+                                           actions, go_load_tool_pos,
+                                           go_home)
+        single_time, single_tree = measure(ActionTree.insert_global_actions,
+                                           actions, go_load_tool_pos,
+                                           go_home)
+
+        effectors = sum(1 for _ in single_tree.filter_nodes(
+            lambda node: node.action_type in ['LOAD.EFFECTOR',
+                                              'UNLOAD.EFFECTOR']))
+        print('{nodes:>8}{effectors:>11}{legacy:>14.2f}{single:>18.2f}'
+              .format(nodes=len(single_tree), effectors=effectors,
+                      legacy=legacy_time * 1000, single=single_time * 1000))
+
+        if shape(legacy_tree) != shape(single_tree):
+            print('the trees shapes differ')
+
+
+if __name__ == '__main__':
+    main()
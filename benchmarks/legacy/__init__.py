@@ -0,0 +1,5 @@
+""" copies of the replaced implementations, used as benchmark references
+
+    kept verbatim, so skipped by pylama. actiontreelib needs treelib,
+    listed in benchmarks/requirement.txt
+"""
@@ -0,0 +1,223 @@
+""" treelib based ActionTree, as before the compact ActionTree,
+    requires treelib (pip install treelib==1.6.1)
+"""
+
+from mars.action import Action
+from treelib import Tree, Node
+from typing import List
+from mars.action import DependenceType
+
+
+class ActionNode(Node):
+    """ class used to represent a tree node containing an Action as data
+        it inherit from treelib.Node class
+
+    Attributes
+    ----------
+    priority : int
+        the action priority
+
+    """
+    def __init__(self, action: Action = None, is_global: bool= False) -> 'ActionNode':
+        """ActionNode initializer
+
+        Args:
+            action (Action, optional): The action represented
+            by the node in the tree. Defaults to None.
+        """
+
+        ''' usage of treelib.Node.__init__() with
+            the action.description as Node name attribute
+            action.id as Node id attribute
+            and the action object as data
+
+            if no action, 'root' as name and 0 as id.
+        '''
+
+        super(ActionNode, self).__init__()
+        
+        if action:
+            self.data = action
+            self.tag = action.description
+            if not is_global:
+                self.identifier = action.id
+        else:
+            self.tag = 'root'
+            self.identifier = 0
+
+
+    def __lt__(self, node: 'ActionNode') -> bool:
+
+        """ operator < function. compare the Action priority
+
+        Args:
+            node (ActionNode): the node to compare with
+
+        Returns:
+            bool: true if action priority is lower than the other one
+        """
+
+        return True if self.priority > node.priority else False
+
+    def __gt__(self, node: 'ActionNode'):
+
+        """ operator > function. compare the action priority
+
+        Args:
+            node (ActionNode): the node to compare with
+
+        Returns:
+            bool: true if action priority is upper than the other one
+        """
+
+        return True if self.priority < node.priority else False
+
+    def __eq__(self, node):
+        """ operator = function. compare the Action priority
+
+        Args:
+            node (ActionNode): the node to compare with
+
+        Returns:
+            bool: true if action priority is equal than the other one
+        """
+        return True if self.priority == node.priority else False
+
+    @property
+    def sort_key(self):
+        return self.data.work_order
+
+    @property
+    def priority(self) -> int:
+        """ get the action priority
+
+        Returns:
+            int: the action priority
+        """
+
+        if self.data:
+            return self.data.priority
+        else:
+            return 0
+
+    @property
+    def action_type(self) -> str or None:
+        if self.data:
+            return self.data.type
+        else:
+            return None
+
+def getDependences(action):
+    alist = listDependences(action, action.priority)
+    alist.sort(key=lambda item: item[0])
+    return [a[1] for a in alist]
+    # return alist
+
+
+def listDependences(action, dn=0):
+    alist = [(dn, action)]
+    for dep in action.dependences:
+        if dep.dependence_type == DependenceType.UPSTREAM :
+            alist.extend(listDependences(dep.action, dep.action.priority))
+        elif dep.dependence_type == DependenceType.DOWNSTREAM :
+            alist.extend(listDependences(dep.action, 9999-dep.action.priority))
+        else :
+            raise Exception("unknow dependence type")
+    return alist
+
+'''
+def listDependences(action, dn=0):
+    alist = [(dn, action)]
+    for a in action.upstream_dependences:
+        alist.extend(Dependencies.__listDependences(a, a.priority))
+    for a in action.downstream_dependences:
+        alist.extend(Dependencies.__listDependences(a, 9999-a.priority))
+    return alist
+'''
+
+
+class ActionTree(Tree):
+    """ class used to represent a tree containing ActionNode.
+        it inherit form treelib.Tree class
+    """
+
+    def __init__(self):
+        """ActionTree initializer
+        """
+        # usage of treelib.Tree.__init__ to initialize Tree
+        super(ActionTree, self).__init__()
+        # add a root ActionNode in the tree
+        self.add_node(ActionNode())
+
+    def add_action_node(self, action_node: ActionNode, parent: ActionNode or None):
+        """ add an ActionNode in the tree if not allready exist
+        (id already present)
+
+        Args:
+            action_node (ActionNode): the ActionNode to add
+            parent (ActionNode): the ActionNode parent
+        """
+
+        # if the ActionNode not alread in the tree, add the ActionNode
+        if not self.contains(action_node.identifier):
+            self.add_node(action_node, parent=parent)
+
+    def add_action_nodes(self, actions: List[ActionNode]):
+        """ add list of actions
+
+        Args:
+            actions (List[ActionNode]): [description]
+        """
+
+        current = self.get_node(0)
+        action_nodes = [ActionNode(an) for an in actions]
+
+        for an in action_nodes:
+            parent = self.__getParent(an, current)
+            self.add_action_node(an, parent)
+            current = an
+
+    def __getParent(self, actual_node: ActionNode, previous_node: ActionNode):
+
+        if actual_node == previous_node:
+            parent = self.parent(previous_node.identifier)
+
+        elif actual_node < previous_node:
+            parent = previous_node
+
+        else:
+            parent = self.__getParent(actual_node,
+                                      self.parent(previous_node.identifier))
+
+        return parent
+
+    def add_branch_for_action(self, branch_end: Action):
+        dl = getDependences(branch_end)
+        self.add_action_nodes(dl)
+
+    def iter_actions(self):
+        """ generate the actions in the tree traversal order,
+            without the root node
+
+        Yields:
+            Action: the action
+        """
+        expanded = self.expand_tree(key=lambda node: node.sort_key if node.sort_key else 9999)
+        for nid in expanded:
+            action = self.get_node(nid).data
+            # the root node has no action
+            if action is not None:
+                yield action
+
+    def iter_sequence(self):
+        """ generate the actions sequences in the tree traversal order,
+            each sequence is computed when the traversal reaches its action
+
+        Yields:
+            Dict: the action sequence
+        """
+        for action in self.iter_actions():
+            yield action.get_sequence()
+
+    def get_sequence(self):
+        return list(self.iter_sequence())
@@ -0,0 +1,75 @@
+""" global actions insertion of build_process_tree,
+    as before the single pass ActionTree.insert_global_actions
+"""
+from mars.action import Action
+from mars.actiontreelib import ActionTree, ActionNode
+
+
+def insert_global_actions(process_tree: ActionTree,
+                          go_load_tool_pos: Action,
+                          go_home: Action):
+
+    # insert go load tool position action before load and unload actions
+    # list of targeted actions
+    lul_action_types = ['LOAD.EFFECTOR', 'UNLOAD.EFFECTOR']
+    # filter the tree to localize the actions => return a filter generator
+    load_unload_nodes = process_tree.filter_nodes(lambda node: node.action_type in lul_action_types)
+    # transform the filter to list
+    load_unload_nodes = list(load_unload_nodes)
+
+    prev_node_actype = None
+    prev_loadtool_node_id = None
+
+    # iteration to insert go load tool position action
+    for lul_node in load_unload_nodes:
+        # get the targeted node
+        # tnode = process_tree.get_node(lul_node.identifier)
+        if lul_node.action_type == 'LOAD.EFFECTOR':
+            if prev_node_actype:
+                if not prev_node_actype == 'UNLOAD.EFFECTOR':
+                    load_tool_id = insert_load_pos_action(process_tree, lul_node.identifier, go_load_tool_pos)
+                    prev_loadtool_node_id = load_tool_id
+                else:
+                    process_tree.move_node(lul_node.identifier, prev_loadtool_node_id)
+            else:
+                load_tool_id = insert_load_pos_action(process_tree, lul_node.identifier, go_load_tool_pos)
+                prev_loadtool_node_id = load_tool_id
+        else:
+            load_tool_id = insert_load_pos_action(process_tree, lul_node.identifier, go_load_tool_pos)
+            prev_loadtool_node_id = load_tool_id
+        
+        prev_node_actype = lul_node.action_type
+
+
+    # insert a go home and return home node
+    # get the root node
+    root_node = process_tree.get_node(0)
+    # get the root node children
+    root_node_children = process_tree.children(0)
+    # create a go home and return home action node
+    go_home_node = ActionNode(go_home, is_global=True)
+    return_home_node = ActionNode(go_home, is_global=True)
+
+    # insert the go home node in root
+    process_tree.add_action_node(go_home_node, parent=root_node)
+
+    # move all the root children in go_home node
+    for ch in root_node_children:
+        process_tree.move_node(ch.identifier, go_home_node.identifier)
+
+    # insert the return home node in root
+    process_tree.add_action_node(return_home_node, parent=root_node)
+
+
+def insert_load_pos_action(tree: ActionTree,
+                           target_action_id: int,
+                           go_tool_pos: Action) -> int:
+    node = tree.get_node(target_action_id)
+    node_parent = tree.parent(target_action_id)
+    # create the go to load tool position action as a global action
+    load_tool_node = ActionNode(go_tool_pos, is_global=True)
+    # insert the node in the tree as a tnode_parent children
+    tree.add_action_node(load_tool_node, parent=node_parent)
+    # move the targeted node as a go load tool children
+    tree.move_node(target_action_id, load_tool_node.identifier)
+    return load_tool_node.identifier
@@ -0,0 +1,100 @@
+""" object based Movement, as before the columnar Movement : one Point,
+    Position, Configuration and vector array per movement point
+"""
+from typing import Dict, List
+
+from mars.definition import Definition
+from mars.movement import Point
+import mars.proxyapi as proxyapi
+
+
+class Movement(Definition):
+
+    """ Class used to represent a Movement
+    """
+    def __init__(self, uf: int, ut: int, points: List[Point]):
+        """Movement object initializer
+
+        Args:
+            uf (int): user frame id
+            ut (int): user tool id
+            points (List[Point]): list of points describing the movement
+        """
+        self._uf: int = uf
+        self._ut: int = ut
+        self._points: List[Point] = points
+
+    @property
+    def points(self) -> List[Point]:
+        return self._points
+
+    @staticmethod
+    def parse(serialize_movement: Dict) -> 'Movement':
+        ut = serialize_movement['ut']
+        uf = serialize_movement['uf']
+        points = []
+
+        for sp in serialize_movement['points']:
+            points.append(Point.parse(sp))
+
+        return Movement(uf, ut, points)
+
+    def to_dict(self):
+        return {
+            "uf": self._uf,
+            "ut": self._ut,
+            "points": [p.to_dict() for p in self._points]
+        }
+
+    def get_sequence(self):
+        # first info in setting -> nbr of pos register write
+        points_settings = [len(self._points)]
+        points_parameters = []
+
+        for p in self._points:
+            p_para = p.get_sequence()
+            points_parameters.append(p_para['position'])
+            points_settings.extend(p_para['settings'])
+
+        # if only one point -> position_set_request else positions_set_request
+        if len(points_parameters) > 1:
+            position_set_request = proxyapi\
+                .positions_set_request(points_parameters)
+        else:
+            position_set_request = proxyapi\
+                .position_set_request(points_parameters[0])
+
+        possettings_set_request = proxyapi\
+            .possettings_set_request(points_settings)
+
+        sequence = []
+
+        # first stage set uf and ut
+        # sequence.append(proxyapi.utuf_set_request(self._uf, self._ut))
+
+        # second stage set num reg 1 to launch change UTUF program
+        # and wait for program end
+        # return list so sequence extend
+        # sequence.extend(proxyapi
+        #                .launch_program_request(proxyapi
+        #                                        .ProgramCode.CHANGE_UTUF))
+
+        # third stage set numeric register 20 to X
+        # update position settings (speed, path ...)
+        if (type(possettings_set_request) == list):
+            sequence.extend(possettings_set_request)
+        else:
+            sequence.append(possettings_set_request)
+
+        # fourth stage set position register 20 to X
+        # update position settings (speed, path ...)
+        if(type(position_set_request) == list):
+            sequence.extend(position_set_request)
+        else:
+            sequence.append(position_set_request)
+
+        # fifth stage set num reg 1 to launch change TRAJ_GEN program
+        sequence.extend(proxyapi
+                        .launch_program_request(proxyapi.ProgramCode.TRAJ_GEN))
+
+        return sequence
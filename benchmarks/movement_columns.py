@@ -0,0 +1,98 @@
+""" benchmark of the columnar Movement against the previous object based
+    Movement on the C35 flange movements (stations, approaches,
+    clearances and works), replicated : parsing, to_dict and get_sequence
+    time, memory held by the parsed movements, identical output check,
+    also for the movements built from Point objects
+
+    usage : python -m benchmarks.movement_columns
+"""
+import json
+import time
+import tracemalloc
+from typing import Callable, Dict, List
+
+from mars.movement import Movement, Point
+from benchmarks.c35 import load_c35_documents
+from benchmarks.legacy.movement import Movement as LegacyMovement
+
+# copies of the flange movements, 188 movements per copy
+COPIES = [10, 100]
+REPEAT = 3
+
+
+def flange_movements() -> List[Dict]:
+    """ get the definitions of the C35 flange movements
+
+    Returns:
+        List[Dict]: the movement definitions
+    """
+    return [doc['definition'] for doc in load_c35_documents()
+            if doc.get('targeted_area', {}).get('area') == 'FLANGE'
+            and 'points' in doc['definition']]
+
+
+def best_time(func: Callable) -> float:
+    times = []
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def parsed_size(movement_class, definitions: List[Dict]) -> int:
+    # memory allocated by the parsed movements
+    tracemalloc.start()
+    start = tracemalloc.get_traced_memory()[0]
+    movements = [movement_class.parse(d) for d in definitions]
+    size = tracemalloc.get_traced_memory()[0] - start
+    tracemalloc.stop()
+    del movements
+    return size
+
+
+def main():
+    definitions = flange_movements()
+    points = sum(len(d['points']) for d in definitions)
+    print('{count} flange movements, {points} points'
+          .format(count=len(definitions), points=points))
+    print('{copies:>8}{impl:>10}{parse:>13}{to_dict:>15}{seq:>19}'
+          '{memory:>15}'
+          .format(copies='copies', impl='movement', parse='parse (ms)',
+                  to_dict='to_dict (ms)', seq='get_sequence (ms)',
+                  memory='memory (kB)'))
+
+    for copies in COPIES:
+        replicated = definitions * copies
+        results = {}
+        for name, movement_class in [('objects', LegacyMovement),
+                                     ('columns', Movement)]:
+            movements = [movement_class.parse(d) for d in replicated]
+            results[name] = (
+                json.dumps([m.to_dict() for m in movements[:len(definitions)]]),
+                json.dumps([m.get_sequence()
+                            for m in movements[:len(definitions)]]))
+            print('{copies:>8}{impl:>10}{parse:>13.1f}{to_dict:>15.1f}'
+                  '{seq:>19.1f}{memory:>15.0f}'.format(
+                      copies=copies, impl=name,
+                      parse=best_time(lambda: [movement_class.parse(d)
+                                               for d in replicated]) * 1000,
+                      to_dict=best_time(lambda: [m.to_dict()
+                                                 for m in movements]) * 1000,
+                      seq=best_time(lambda: [m.get_sequence()
+                                             for m in movements]) * 1000,
+                      memory=parsed_size(movement_class, replicated) / 1024))
+
+        assert results['objects'] == results['columns'], \
+            'the columnar movements output differs'
+
+    # the movements built from Point objects, as by the notebooks
+    from_points = [Movement(d['uf'], d['ut'],
+                            [Point.parse(sp) for sp in d['points']])
+                   for d in definitions]
+    assert json.dumps([m.to_dict() for m in from_points])\
+        == results['columns'][0], 'the Point built movements output differs'
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+""" microbenchmark of Movement.get_sequence on 10k movements, the
+    C35 movements replicated, with the shared request skeletons of
+    mars.proxyapi against the previous request builders
+
+    usage : python -m benchmarks.movement_sequence
+"""
+import contextlib
+import json
+import time
+
+import mars.movement
+from mars.movement import Movement
+from benchmarks.c35 import load_c35_documents
+from benchmarks.legacy import proxyapi as legacy_proxyapi
+
+MOVEMENTS = 10000
+REPEAT = 5
+
+
+@contextlib.contextmanager
+def request_builders(proxyapi):
+    # build the movements requests with another proxyapi module
+    current = mars.movement.proxyapi
+    mars.movement.proxyapi = proxyapi
+    try:
+        yield
+    finally:
+        mars.movement.proxyapi = current
+
+
+def best_time(movements) -> float:
+    times = []
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        for movement in movements:
+            movement.get_sequence()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    definitions = [doc['definition'] for doc in load_c35_documents()
+                   if 'points' in doc['definition']]
+    movements = [Movement.parse(definitions[index % len(definitions)])
+                 for index in range(MOVEMENTS)]
+
+    with request_builders(legacy_proxyapi):
+        legacy_output = json.dumps([m.get_sequence() for m in movements])
+        legacy_time = best_time(movements)
+    output = json.dumps([m.get_sequence() for m in movements])
+    shared_time = best_time(movements)
+    assert output == legacy_output, 'the requests differ'
+
+    print('{count} movements, {points} points'.format(
+        count=len(movements),
+        points=sum(len(m.point_array) for m in movements)))
+    print('{builders:>20}{total:>12}{per:>18}'
+          .format(builders='builders', total='time (ms)',
+                  per='per movement (us)'))
+    for name, elapsed in [('previous', legacy_time),
+                          ('shared skeletons', shared_time)]:
+        print('{builders:>20}{total:>12.1f}{per:>18.1f}'
+              .format(builders=name, total=elapsed * 1000,
+                      per=elapsed / len(movements) * 1e6))
+
+
+if __name__ == '__main__':
+    main()
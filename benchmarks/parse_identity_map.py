@@ -0,0 +1,67 @@
+""" benchmark of the actions parsing with and without identity map
+    on the whole C35 catalog (work on all the fasteners)
+
+    usage : python -m benchmarks.parse_identity_map
+"""
+import gc
+import timeit
+from collections import Counter
+
+from mars.action import Action
+from mars.movement import Movement, Point, Position
+from benchmarks.c35 import (GLOBAL_ACTION_IDS, full_product_query,
+                            load_c35_catalog)
+
+
+class NoIdentityMap(dict):
+    """ identity map never storing anything,
+        to reproduce the parsing without memoization
+    """
+    def __setitem__(self, key, value):
+        pass
+
+
+def parse_all(root_actions, dependences, identity_map_factory):
+    identity_map = identity_map_factory()
+    return [Action.parse(ra, dependences, identity_map)
+            for ra in root_actions]
+
+
+def count_objects(actions) -> Counter:
+    gc.collect()
+    counted = (Action, Movement, Point, Position)
+    counter = Counter()
+    for obj in gc.get_objects():
+        for cls in counted:
+            if isinstance(obj, cls):
+                counter[cls.__name__] += 1
+    return counter
+
+
+def main():
+    catalog = load_c35_catalog()
+    root_actions, dependences, _ = catalog.extract_actions(
+        full_product_query(), GLOBAL_ACTION_IDS)
+
+    print('{roots} root actions, {deps} dependences'
+          .format(roots=len(root_actions), deps=len(dependences)))
+    print('{mode:<18}{time:>12}  objects'
+          .format(mode='mode', time='time (ms)'))
+
+    for mode, factory in [('no identity map', NoIdentityMap),
+                          ('identity map', dict)]:
+        times = timeit.repeat(lambda: parse_all(root_actions,
+                                                dependences,
+                                                factory),
+                              number=1, repeat=10)
+        actions = parse_all(root_actions, dependences, factory)
+        counter = count_objects(actions)
+        print('{mode:<18}{time:>12.2f}  {objects}'
+              .format(mode=mode,
+                      time=min(times) * 1000,
+                      objects=dict(counter)))
+        del actions
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,139 @@
+""" end to end benchmark of the sequence request pipeline on synthetic
+    catalogs of 1k to 100k actions held in memory : actions extraction,
+    process tree building, sequence generation, process tree description
+    and json encoding, the time and the memory peak of each stage
+
+    the stages do what the http_server functions of the same name do
+    for a request on all the fasteners, without options
+
+    usage : python -m benchmarks.pipeline [actions ...]
+"""
+import json
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Tuple
+
+from mars.action import Action
+from mars.actiontreelib import ActionTree
+from mars.catalog import ActionCatalog
+from mars.description import describe_sequence
+from benchmarks.c35 import GLOBAL_ACTION_IDS, full_product_query
+from benchmarks.synthetic import catalog_size, generate_catalog
+
+# approximate number of actions of the catalogs
+SIZES = [1000, 10000, 100000]
+
+# shape of the synthetic catalogs
+FASTENERS_PER_RAIL = 50
+POINTS_PER_MOVEMENT = 6
+EFFECTOR_SWAPS = 3
+FAN_IN = 2
+
+
+def build_process_tree(root_actions: List[Dict],
+                       dependences: Dict[str, Dict],
+                       global_actions: Dict[str, Dict]) -> ActionTree:
+    identity_map = {}
+    actions = [Action.parse(ra, dependences, identity_map)
+               for ra in root_actions]
+    go_load_tool_pos = Action.parse(global_actions['load_tool_position'],
+                                    dependences, identity_map)
+    go_home = Action.parse(global_actions['home'], dependences, identity_map)
+    process_tree = ActionTree()
+    process_tree.add_branches(actions)
+    process_tree.insert_global_actions(go_load_tool_pos, go_home)
+    return process_tree
+
+
+def pipeline_stages(catalog: ActionCatalog) -> List[Tuple[str, Callable]]:
+    """ get the stages of a request on all the fasteners of a catalog,
+        each stage taking the result of the previous one
+
+    Args:
+        catalog (ActionCatalog): the in memory catalog
+
+    Returns:
+        List[Tuple[str, Callable]]: the stages names and functions
+    """
+    def generate_result(sequence: List[Dict]) -> Dict:
+        return {"status": 'SUCCESS',
+                "sequence": sequence,
+                "processTree": describe_sequence(sequence)}
+
+    return [
+        ('extract_actions',
+         lambda _: catalog.extract_actions(full_product_query(),
+                                           GLOBAL_ACTION_IDS)),
+        ('build_process_tree', lambda actions: build_process_tree(*actions)),
+        ('get_sequence',
+         lambda tree: [a.get_sequence() for a in tree.iter_actions()]),
+        ('generate_desc', generate_result),
+        ('json_encoding', json.dumps)
+    ]
+
+
+def run_stages(stages: List[Tuple[str, Callable]],
+               trace_memory: bool) -> Dict[str, float]:
+    """ run the stages once
+
+    Args:
+        stages (List[Tuple[str, Callable]]): the pipeline stages
+        trace_memory (bool): measure the memory peak of each stage
+            instead of its duration, tracemalloc slowing the stages
+
+    Returns:
+        Dict[str, float]: the duration (s) or memory peak (bytes)
+            of each stage
+    """
+    measures = {}
+    result = None
+    if trace_memory:
+        tracemalloc.start()
+    try:
+        for name, stage in stages:
+            if trace_memory:
+                tracemalloc.reset_peak()
+                start = tracemalloc.get_traced_memory()[0]
+                result = stage(result)
+                measures[name] = tracemalloc.get_traced_memory()[1] - start
+            else:
+                start = time.perf_counter()
+                result = stage(result)
+                measures[name] = time.perf_counter() - start
+    finally:
+        if trace_memory:
+            tracemalloc.stop()
+    return measures
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or SIZES
+    print('{stage:>20}{time:>12}{peak:>12}'
+          .format(stage='stage', time='time (ms)', peak='peak (MB)'))
+
+    for size in sizes:
+        rails = max(EFFECTOR_SWAPS + 1,
+                    round(size / (FASTENERS_PER_RAIL + 3)))
+        catalog = ActionCatalog(generate_catalog(rails, FASTENERS_PER_RAIL,
+                                                 POINTS_PER_MOVEMENT,
+                                                 EFFECTOR_SWAPS, FAN_IN))
+        assert len(catalog) == catalog_size(rails, FASTENERS_PER_RAIL,
+                                            EFFECTOR_SWAPS)
+        stages = pipeline_stages(catalog)
+        times = run_stages(stages, trace_memory=False)
+        peaks = run_stages(stages, trace_memory=True)
+
+        print('{count} actions, {rails} rails'
+              .format(count=len(catalog), rails=rails))
+        for name, _ in stages:
+            print('{stage:>20}{time:>12.1f}{peak:>12.1f}'
+                  .format(stage=name, time=times[name] * 1000,
+                          peak=peaks[name] / 2**20))
+        print('{stage:>20}{time:>12.1f}{peak:>12.1f}'
+              .format(stage='total', time=sum(times.values()) * 1000,
+                      peak=max(peaks.values()) / 2**20))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,226 @@
+""" generator of synthetic carrier action catalogs, shaped as the C35
+    catalog : for each rail a station, an approach and a clearance
+    movement and the work movements on its fasteners, for each group
+    of rails worked with the same effector an effector load and unload,
+    and the C35 global actions
+
+    usage : python -m benchmarks.synthetic [rails] [fasteners per rail]
+"""
+from collections import Counter
+import random
+import sys
+from typing import Dict, List
+
+from benchmarks.c35 import GLOBAL_ACTION_IDS, load_c35_documents
+
+# effectors used in turn by the groups of rails, with the area they work on
+EFFECTORS = [('WEBEFFECTOR', 'WEB'), ('FLANGEEFFECTOR', 'FLANGE')]
+
+# 7th axis position range of the stations (mm)
+E1_RANGE = (100.0, 4000.0)
+
+# arm configuration of the work positions
+WORK_CONFIG = {'wrist': 'FLIP', 'forearm': 'UP', 'arm': 'TOWARD',
+               'j4': 0, 'j5': 0, 'j6': 0}
+
+
+def catalog_size(rails: int, fasteners_per_rail: int,
+                 effector_swaps: int = 1) -> int:
+    """ get the number of actions of a generated catalog
+
+    Args:
+        rails (int): number of rails
+        fasteners_per_rail (int): number of fasteners on each rail
+        effector_swaps (int, optional): number of effector changes.
+            Defaults to 1.
+
+    Returns:
+        int: the number of documents generate_catalog returns
+    """
+    return rails * (3 + fasteners_per_rail) + 2 * (effector_swaps + 1)\
+        + len(GLOBAL_ACTION_IDS)
+
+
+def generate_catalog(rails: int = 10,
+                     fasteners_per_rail: int = 50,
+                     points_per_movement: int = 6,
+                     effector_swaps: int = 1,
+                     fan_in: int = 0,
+                     seed: int = 0) -> List[Dict]:
+    """ generate a synthetic carrier action catalog
+
+        the rails are split in effector_swaps + 1 groups of consecutive
+        rails, each group loading its own effector, the effectors of
+        EFFECTORS being used in turn. as in the C35 catalog each work
+        movement depends on the approach of its rail, which depends on
+        the effector load, the rail station and the rail clearance.
+
+    Args:
+        rails (int, optional): number of rails. Defaults to 10.
+        fasteners_per_rail (int, optional): number of fasteners, so of
+            work movements, on each rail. Defaults to 50.
+        points_per_movement (int, optional): number of points of the
+            approach, clearance and work movements, the stations having
+            one point. Defaults to 6.
+        effector_swaps (int, optional): number of effector changes
+            between the groups of rails. Defaults to 1.
+        fan_in (int, optional): number of previous work movements
+            of the rail each work movement also depends on. Defaults to 0.
+        seed (int, optional): seed of the positions generation.
+            Defaults to 0.
+
+    Raises:
+        ValueError: if there are more effector groups than rails
+
+    Returns:
+        List[Dict]: the catalog documents
+    """
+    if effector_swaps >= rails:
+        raise ValueError('{swaps} effector swaps need more than {rails} rails'
+                         .format(swaps=effector_swaps, rails=rails))
+
+    rng = random.Random(seed)
+    documents = [doc for doc in load_c35_documents()
+                 if doc['_id'] in GLOBAL_ACTION_IDS]
+    groups = effector_swaps + 1
+    fastener_id = 0
+
+    for group in range(groups):
+        reference, area = EFFECTORS[group % len(EFFECTORS)]
+        unload = {
+            '_id': 'unload_{group}'.format(group=group),
+            'type': 'UNLOAD.EFFECTOR',
+            'description': 'unload {ref} effector'.format(ref=reference),
+            'definition': tool_definition(reference, 'UNLOAD'),
+            'dependences': []
+        }
+        load = {
+            '_id': 'load_{group}'.format(group=group),
+            'type': 'LOAD.EFFECTOR',
+            'description': 'load {ref} effector'.format(ref=reference),
+            'definition': tool_definition(reference, 'LOAD'),
+            'dependences': [dependence(unload, 'DOWNSTREAM')]
+        }
+        documents.extend([unload, load])
+
+        group_rails = range(group * rails // groups,
+                            (group + 1) * rails // groups)
+        for work_order, rail in enumerate(group_rails, 1):
+            e1 = round(rng.uniform(*E1_RANGE), 1)
+            rail_reference = {'designation': 'rail',
+                              'reference': 'SYNTHETICRAIL',
+                              'id': float(rail + 1)}
+            rail_fields = {'work_order': work_order,
+                           'product_reference': rail_reference,
+                           'targeted_area': {'area': area}}
+
+            station = dict(
+                rail_fields,
+                _id='station_{rail}'.format(rail=rail),
+                type='MOVE.STATION.WORK',
+                description='station movement on rail {rail}'
+                            .format(rail=rail + 1),
+                definition=movement_definition(
+                    [joint_point(rng, e1, 0.0, 50.0, 'JOINT')]),
+                dependences=[])
+            clearance = dict(
+                rail_fields,
+                _id='clearance_{rail}'.format(rail=rail),
+                type='MOVE.ARM.CLEARANCE',
+                description='clearance movement from rail {rail}'
+                            .format(rail=rail + 1),
+                definition=movement_definition(
+                    [joint_point(rng, e1, 50.0, 50.0, 'JOINT')
+                     for _ in range(points_per_movement)]),
+                dependences=[])
+            approach = dict(
+                rail_fields,
+                _id='approach_{rail}'.format(rail=rail),
+                type='MOVE.ARM.APPROACH',
+                description='approach movement to rail {rail}'
+                            .format(rail=rail + 1),
+                definition=movement_definition(
+                    [joint_point(rng, e1, 50.0, 50.0, 'JOINT')
+                     for _ in range(points_per_movement)]),
+                dependences=[dependence(load, 'UPSTREAM'),
+                             dependence(station, 'UPSTREAM'),
+                             dependence(clearance, 'DOWNSTREAM')])
+            documents.extend([station, clearance, approach])
+
+            works = []
+            for index in range(fasteners_per_rail):
+                fastener_id += 1
+                previous = works[max(0, index - fan_in):index]
+                work = {
+                    '_id': 'work_{rail}_{index}'.format(rail=rail,
+                                                        index=index),
+                    'type': 'MOVE.ARM.WORK',
+                    'description': 'work movement on location of fastener '
+                                   'ASNA2392-3-04.{fid} of rail {rail}'
+                                   .format(fid=fastener_id, rail=rail + 1),
+                    'definition': movement_definition(
+                        [cartesian_point(rng, e1)
+                         for _ in range(points_per_movement)]),
+                    'dependences': [dependence(approach, 'UPSTREAM')] +
+                                   [dependence(doc, 'UPSTREAM')
+                                    for doc in previous],
+                    'work_order': index + 1,
+                    'product_reference': {'designation': 'fastener',
+                                          'reference': 'ASNA2392-3-04',
+                                          'id': float(fastener_id),
+                                          'parent': rail_reference},
+                    'targeted_area': {'area': area}
+                }
+                works.append(work)
+            documents.extend(works)
+
+    return documents
+
+
+def dependence(document: Dict, dependence_type: str) -> Dict:
+    return {'action': document['_id'], 'type': dependence_type}
+
+
+def tool_definition(reference: str, manipulation: str) -> Dict:
+    return {'ut': 1 if manipulation == 'LOAD' else 3,
+            'uf': 3,
+            'tool_type': 'effector',
+            'tool_reference': reference,
+            'manipulation': manipulation}
+
+
+def movement_definition(points: List[Dict]) -> Dict:
+    return {'uf': 3, 'ut': 1, 'points': points}
+
+
+def joint_point(rng: random.Random, e1: float, cnt: float, speed: float,
+                path: str) -> Dict:
+    vector = {'j{axis}'.format(axis=axis): round(rng.uniform(-90, 90), 2)
+              for axis in range(1, 7)}
+    return {'cnt': cnt, 'speed': speed, 'path': path,
+            'position': {'ut': 0, 'uf': 0, 'type': 'JOINT', 'e1': e1,
+                         'vector': vector, 'config': None}}
+
+
+def cartesian_point(rng: random.Random, e1: float) -> Dict:
+    vector = {'x': round(rng.uniform(0, 500), 2),
+              'y': round(rng.uniform(0, 3000), 2),
+              'z': round(rng.uniform(0, 50), 2),
+              'w': 90.0, 'p': round(rng.uniform(-90, 90), 2), 'r': -180.0}
+    return {'cnt': 0.0, 'speed': 100.0, 'path': 'LINEAR',
+            'position': {'ut': 0, 'uf': 0, 'type': 'CARTESIAN', 'e1': e1,
+                         'vector': vector, 'config': dict(WORK_CONFIG)}}
+
+
+def main():
+    rails = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    fasteners = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    documents = generate_catalog(rails, fasteners)
+    print('{count} actions'.format(count=len(documents)))
+    for action_type, count in sorted(Counter(doc['type']
+                                             for doc in documents).items()):
+        print('{type:>20}{count:>8}'.format(type=action_type, count=count))
+
+
+if __name__ == '__main__':
+    main()
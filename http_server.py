@@ -1,11 +1,11 @@
-from typing import Dict
+from typing import Dict, List
 from enum import Enum
 import json
 import sys
 
 import pathlib
 # flask imports for server implementation
-from flask import Flask, request, jsonify, logging
+from flask import Flask, request, jsonify, logging, stream_with_context, abort
 
 # pymongo imports for mongodb utilisation
 from pymongo import MongoClient
@@ -20,6 +20,19 @@ from config import Config, KeyNotFoundError as KeyConfigError
 import fastjsonschema
 
 from mars.action import Action
+from mars.validation import ValidatorRegistry
+from mars.cache import CatalogWatcher, SequenceCache, canonical_request
+from mars.catalog import ActionCatalog, match_document
+from mars.closure import ClosureIndex
+from mars.metrics import Metrics
+from mars.scheduler import DependenceCycleError
+from mars.planner import plan_process_tree
+from mars.cycletime import CycleTimeModel, estimate_cycle_time
+from mars.description import describe_sequence
+from mars.encoding import JSON_MIMETYPE, binary_mimetypes, encode_binary
+from mars.proxyapi import TRACKER_INTERVAL
+from mars.patching import BranchTree
+from mars.profiling import RequestProfiler, RequestProfile
 from mars.actiontreelib import ActionTree, ActionNode
 
 # get the application absolute path
@@ -29,6 +42,26 @@ valschemas_file_path = str(file_folder)+'/validation_schema.json'
 # get the application config file path
 config_file_path = str(file_folder)+'/server.cfg'
 
+# _id of the actions added to all the sequences
+GLOBAL_ACTION_IDS = ['home', 'load_tool_position']
+
+# mimetype of the streamed sequence response, one json record per line
+NDJSON_MIMETYPE = 'application/x-ndjson'
+
+# content type of the prometheus text exposition format
+METRICS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# request header and query arg asking to profile a request
+# and response header giving the profile id
+PROFILE_HEADER = 'X-Mars-Profile'
+PROFILE_ARG = 'profile'
+PROFILE_ID_HEADER = 'X-Mars-Profile-Id'
+
+# thread pools running the request flow steps in asynchronous mode :
+# the database requests and the cpu bound processing
+IO_STEP = 'io'
+CPU_STEP = 'cpu'
+
 
 class ActionType(Enum):
     station = 'MOVE.STATION.WORK'
@@ -52,19 +85,54 @@ server = Flask(__name__)
 
 # try to read configuration
 try:
-    # read the validation schema from json file
-    with open(valschemas_file_path, 'r') as schfile:
-        schstr = schfile.read()
-        validation_schema = json.loads(schstr)
     # read the server configuration from configuration files
     server_config = Config(config_file_path)
 
+    # compile all the validation schemas once
+    # optionally using a disk cache of the generated validators
+    validators = ValidatorRegistry(
+        valschemas_file_path,
+        cache_dir=server_config.get('validation.cacheDirectory', None))
+
     mongo_host = server_config['mongodb.host']
     mongo_port = server_config['mongodb.port']
     mongo_db = server_config['mongodb.database']
     mongo_collection = server_config['mongodb.collection']
     server_port = server_config['server.port']
     server_host = server_config['server.host']
+    cache_size = server_config.get('cache.size', 0)
+    cache_poll_interval = server_config.get('cache.pollInterval', 5)
+    tree_cache_size = server_config.get('cache.trees', 0)
+    catalog_in_memory = server_config.get('catalog.inMemory', False)
+    catalog_closure_index = server_config.get('catalog.closureIndex', False)
+
+    # request processing metrics, exposed on /metrics
+    metrics = Metrics(server_config.get('metrics.enabled', False))
+
+    # cell timings used to estimate the sequences execution time
+    cycle_time_model = CycleTimeModel(
+        joint_speed=server_config.get('cycleTime.jointSpeed', 180.0),
+        e1_speed=server_config.get('cycleTime.e1Speed', 1000.0),
+        linear_joint_ratio=server_config.get('cycleTime.linearJointRatio',
+                                             15.0),
+        fine_stop_time=server_config.get('cycleTime.fineStopTime', 0.1),
+        unknown_move_time=server_config.get('cycleTime.unknownMoveTime',
+                                            1.0),
+        tool_change_time=server_config.get('cycleTime.toolChangeTime', 30.0),
+        program_times=server_config.get('cycleTime.programTimes', None),
+        action_times=server_config.get('cycleTime.actionTimes', None))
+
+    # polling interval (ms) of the program end tracker
+    tracker_interval = server_config.get('tracker.interval',
+                                         TRACKER_INTERVAL)
+
+    # on demand profiling of single requests
+    request_profiler = RequestProfiler(
+        str(file_folder.joinpath(
+            server_config.get('profiling.directory', 'profiles'))),
+        enabled=server_config.get('profiling.enabled', False),
+        mode=server_config.get('profiling.mode', 'deterministic'),
+        sample_interval=server_config.get('profiling.sampleInterval', 0.001))
 except FileNotFoundError as error:
     if error.filename == valschemas_file_path:
         print("validation schema error")
@@ -75,6 +143,50 @@ except KeyConfigError as error:
     print("One or several keys are missing in configuration file.")
     print(error.args[0])
     sys.exit(1)
+except ValueError as error:
+    print("configuration error")
+    print(error)
+    sys.exit(1)
+
+
+def reloadCatalog(change):
+    # catalog change listener, update the in memory catalog
+    # with the changed action if known, else reload it
+    global action_catalog
+    if action_catalog is None:
+        return
+
+    operation = change['operationType'] if change else None
+    if operation == 'delete':
+        action_catalog.remove(change['documentKey']['_id'])
+    elif operation in ['insert', 'replace', 'update']\
+            and change.get('fullDocument'):
+        action_catalog.upsert(change['fullDocument'])
+    else:
+        action_catalog = ActionCatalog(carrier.find())
+
+
+def build_closure_index() -> ClosureIndex:
+    # only the dependences are needed to compute the closures
+    return ClosureIndex(carrier.find({}, {'dependences.action': 1}))
+
+
+def refreshClosures(change):
+    # catalog change listener, refresh the dependence closures
+    # only for the changed action if known
+    global closure_index
+    if closure_index is None:
+        return
+
+    operation = change['operationType'] if change else None
+    if operation == 'delete':
+        closure_index.remove(change['documentKey']['_id'])
+    elif operation in ['insert', 'replace', 'update']\
+            and change.get('fullDocument'):
+        closure_index.upsert(change['fullDocument'])
+    else:
+        closure_index = build_closure_index()
+
 
 try:
     print("Connection to mongodb server ...")
@@ -99,6 +211,39 @@ try:
     else:
         raise KeyError({"target": 'database', "key": mongo_db})
 
+    # load the whole catalog in memory if required
+    action_catalog = None
+    if catalog_in_memory:
+        print('Load the action catalog in memory ...')
+        action_catalog = ActionCatalog(carrier.find())
+
+    # compute the dependence closures of all the catalog actions
+    # to replace the $graphLookup by indexed lookups
+    closure_index = None
+    if catalog_closure_index and action_catalog is None:
+        print('Build the dependence closures index ...')
+        closure_index = build_closure_index()
+
+    # follow the catalog changes to invalidate the sequence cache
+    # and refresh the in memory catalog or closures
+    sequence_cache = None
+    # process trees kept per request family to patch them
+    tree_cache = None
+    catalog_watcher = CatalogWatcher(carrier, cache_poll_interval)
+    catalog_watcher.add_listener(reloadCatalog)
+    catalog_watcher.add_listener(refreshClosures)
+    if cache_size or tree_cache_size or action_catalog is not None\
+            or closure_index is not None:
+        if catalog_watcher.start():
+            if cache_size:
+                sequence_cache = SequenceCache(cache_size)
+            if tree_cache_size:
+                tree_cache = SequenceCache(tree_cache_size)
+        else:
+            print('Catalog change detection not available : '
+                  'sequence and tree caches disabled, '
+                  'in memory catalog and closures not updated')
+
     print()
 except ServerSelectionTimeoutError:
     print('MongoDB error : no mongo server listening on url {host}:{port}'.format(host=mongo_host, port=mongo_port))
@@ -126,6 +271,12 @@ def processingErrorHandler(error):
     return jsonify(status='FAIL', error=str(error)), 407
 
 
+# catalog dependences cycle error handling
+@server.errorhandler(DependenceCycleError)
+def dependenceCycleErrorHandler(error: DependenceCycleError):
+    return jsonify(status='FAIL', error=str(error), cycle=error.cycle), 409
+
+
 # mongodb error handling
 # ENHANCE: enhance mongodb error handling
 @server.errorhandler(ServerSelectionTimeoutError)
@@ -139,27 +290,45 @@ def mongodbErrorHandler(error: Exception):
 def seqMoveHandler():
     # get the request body
     body = request.get_json()
+    return send_flow_response(sequence_request_flow(request, body))
 
-    # check if the body is in accordance with the schema
-    # if not raise a ValidationError
-    validate = fastjsonschema.compile(validation_schema)
-    validate(body)
 
-    print('Build request for database')
-    pipeline = build_aggregation_pipeline(body)
-    
-    print('Send request to database')
-    cursor: Cursor = carrier.aggregate(pipeline)
-    
-    print('Build the process tree')
-    process_tree = build_process_tree(cursor)
-    
-    print('Generate the sequence')
-    sequence = process_tree.get_sequence()
-    tree = generate_desc(sequence)
+# sequence/move/batch ressource handler
+@server.route("/sequence/move/batch", methods=['GET'])
+def seqMoveBatchHandler():
+    # get the request body, a list of sequence requests
+    body = request.get_json()
+    return send_flow_response(batch_request_flow(request, body))
+
+
+def send_flow_response(flow):
+    # run the steps of a request flow in the request thread
+    # and send the response
+    try:
+        step = next(flow)
+        while True:
+            _, function, args = step
+            step = flow.send(function(*args))
+    except StopIteration as stop:
+        data, mimetype, headers = stop.value
+
+    if mimetype == NDJSON_MIMETYPE:
+        data = stream_with_context(data)
+    return server.response_class(data, mimetype=mimetype,
+                                 headers=headers), 200
+
 
-    print('Return sequence to client')
-    return jsonify(status='SUCCESS', sequence=sequence, processTree=tree), 200
+# prometheus metrics ressource handler
+@server.route('/metrics', methods=['GET'])
+def metricsHandler():
+    return server.response_class(metrics.render(),
+                                 content_type=METRICS_CONTENT_TYPE), 200
+
+
+# server statistics ressource handler
+@server.route('/stats', methods=['GET'])
+def statsHandler():
+    return jsonify(status='SUCCESS', **get_stats()), 200
 
 
 @server.route('/', methods=['GET'])
@@ -169,115 +338,460 @@ def baseHandler():
     return "ok"
 
 
-def get_action_target(action_type: str) -> str:
-    if action_type == 'LOAD.EFFECTOR' or\
-       action_type == 'LOAD.TOOL' or\
-       action_type == 'UNLOAD.EFFECTOR' or\
-       action_type == 'UNLOAD.TOOL':
-        return "USER"
-    else:
-        return "ROBOT"
+def get_stats() -> Dict:
+    # get the server components statistics
+    cache_stats = sequence_cache.stats()\
+        if sequence_cache is not None else None
+    tree_cache_stats = tree_cache.stats()\
+        if tree_cache is not None else None
+    return {
+        "validation": validators.stats(),
+        "cache": cache_stats,
+        "treeCache": tree_cache_stats
+    }
 
-def generate_desc(sequence: list):
-    # suppression du la premier et dernier element (home)
-    seq = sequence[1:-1]
 
-    # load_tool_filter = filter(lambda a: a['type'] == 'MOVE.STATION.TOOL', seq)
-    gen = action_group_generator(seq)
-    return list(gen)
+def open_request_profile(req, reqbody: Dict) -> RequestProfile:
+    # open the profile of a request asked with the profile header
+    # or query arg, None if not asked or if profiling is disabled
+    if not request_profiler.enabled:
+        return None
 
-def build_process_tree(cursor: Cursor):
-    # extract dependences from cursor
-    root_actions, dependences, global_actions = extract_actions(cursor)
-    actions = [Action.parse(ra, dependences) for ra in root_actions]
-    # actions = Action.parseList(rootActions, dependences)
+    asked = req.headers.get(PROFILE_HEADER, req.args.get(PROFILE_ARG))
+    if asked is None or asked.lower() in ['0', 'false']:
+        return None
+    return request_profiler.open(canonical_request(reqbody))
 
-    process_tree = ActionTree()
-    for a in actions:
-        process_tree.add_branch_for_action(a)
 
-    # create and insert global actions
-    # create global actions
-    go_load_tool_pos = Action.parse(global_actions['load_tool_position'], dependences)
-    go_home = Action.parse(global_actions['home'], dependences)
+def sequence_request_flow(req, reqbody: Dict):
+    # processing of a sequence request, shared by the two serving modes
+    # the flow yields each step to run as a (pool, function, args) tuple
+    # and receives its result, the server running the step in the
+    # request thread (flask) or in the io or cpu thread pool (asgi)
+    # return the response data, mimetype and headers, the data of
+    # a streamed response being its line generator
 
-    # insert go load tool position action before load and unload actions
-    # list of targeted actions
-    lul_action_types = ['LOAD.EFFECTOR', 'UNLOAD.EFFECTOR']
-    # filter the tree to localize the actions => return a filter generator
-    load_unload_nodes = process_tree.filter_nodes(lambda node: node.action_type in lul_action_types)
-    # transform the filter to list
-    load_unload_nodes = list(load_unload_nodes)
-
-    prev_node_actype = None
-    prev_loadtool_node_id = None
-
-    # iteration to insert go load tool position action
-    for lul_node in load_unload_nodes:
-        # get the targeted node
-        # tnode = process_tree.get_node(lul_node.identifier)
-        if lul_node.action_type == 'LOAD.EFFECTOR':
-            if prev_node_actype:
-                if not prev_node_actype == 'UNLOAD.EFFECTOR':
-                    load_tool_id = insert_load_pos_action(process_tree, lul_node.identifier, go_load_tool_pos)
-                    prev_loadtool_node_id = load_tool_id
-                else:
-                    process_tree.move_node(lul_node.identifier, prev_loadtool_node_id)
-            else:
-                load_tool_id = insert_load_pos_action(process_tree, lul_node.identifier, go_load_tool_pos)
-                prev_loadtool_node_id = load_tool_id
+    # check if the body is in accordance with the schema
+    # if not raise a ValidationError
+    with metrics.timer('validation'):
+        validators.validate('getSequenceRequest', reqbody)
+
+    # json, streamed json records or binary response,
+    # as preferred by the client
+    mimetype = negotiate_mimetype(req)
+    stream = mimetype == NDJSON_MIMETYPE
+    # generate only the asked part of the sequence
+    page = None if stream else get_page_args(req)
+
+    # profile the request if asked, without the sequence cache
+    # the profile id is returned in the response header
+    # and in the json response
+    profile = open_request_profile(req, reqbody)
+    headers = {PROFILE_ID_HEADER: profile.id} if profile is not None else {}
+
+    def step(pool: str, function, *args):
+        # run each step under the profile of a profiled request
+        if profile is None:
+            return pool, function, args
+        return pool, profile.call, (function,) + args
+
+    # return the cached response if the same request
+    # has already been processed on this catalog version
+    cached_mode = profile is None and not stream and page is None
+    if cached_mode:
+        cache_key, catalog_version, cached = get_cached_response(reqbody,
+                                                                 mimetype)
+        if cached is not None:
+            return cached, mimetype, headers
+
+    actions, identity_map, branch_tree = yield step(IO_STEP,
+                                                    select_request_actions,
+                                                    reqbody)
+    process_tree = yield step(CPU_STEP, build_process_tree, *actions,
+                              identity_map, reqbody.get('options'),
+                              branch_tree)
+
+    if stream:
+        lines = generate_ndjson(process_tree)
+        if profile is not None:
+            # the profile is saved at the end of the stream
+            lines = profile.iterate(lines)
+        return lines, mimetype, headers
+
+    if page is not None:
+        result = yield step(CPU_STEP, generate_sequence_page, process_tree,
+                            *page)
+    else:
+        result = yield step(CPU_STEP, generate_result, process_tree)
+    if profile is not None:
+        result['profileId'] = profile.id
+    data = yield step(CPU_STEP, encode_body, result, mimetype)
+
+    if profile is not None:
+        yield IO_STEP, profile.save, ()
+    if cached_mode and sequence_cache is not None:
+        sequence_cache.put(cache_key, catalog_version, data)
+    return data, mimetype, headers
+
+
+def batch_request_flow(req, reqbodies: List[Dict]):
+    # processing of a batch of sequence requests, shared by the two
+    # serving modes as the sequence_request_flow
+
+    # check the list then each request
+    with metrics.timer('validation'):
+        validators.validate('getSequenceBatchRequest', reqbodies)
+        for reqbody in reqbodies:
+            validators.validate('getSequenceRequest', reqbody)
+
+    batch_actions, identity_map = yield (IO_STEP, select_batch_actions,
+                                         (reqbodies,))
+    results = yield (CPU_STEP, generate_batch_results,
+                     (batch_actions, identity_map, reqbodies))
+
+    mimetype = negotiate_mimetype(req, streamed=False)
+    data = yield (CPU_STEP, encode_body,
+                  ({"status": 'SUCCESS', "results": results}, mimetype))
+    return data, mimetype, {}
+
+
+def get_cached_response(reqbody: Dict, mimetype: str = JSON_MIMETYPE):
+    # get the cached response for a request, in the response encoding
+    # return the cache key and the catalog version to cache the response
+    if sequence_cache is None:
+        return None, None, None
+
+    cache_key = canonical_request(reqbody)
+    if mimetype != JSON_MIMETYPE:
+        cache_key = '{mimetype} {key}'.format(mimetype=mimetype, key=cache_key)
+    catalog_version = catalog_watcher.version
+    return cache_key, catalog_version,\
+        sequence_cache.get(cache_key, catalog_version)
+
+
+def select_request_actions(reqbody: Dict):
+    # select the actions for a request
+    # return the actions extracted, the identity map to parse them
+    # and the tree kept for the request family, None if not kept
+    catalog_version = catalog_watcher.version
+    actions, identity_map = select_actions(reqbody)
+    return actions, identity_map,\
+        get_branch_tree(reqbody, identity_map, catalog_version)
+
+
+def get_branch_tree(reqbody: Dict,
+                    identity_map: Dict[str, Action],
+                    catalog_version: int) -> BranchTree:
+    # get the tree kept for the family of a request : the requests
+    # with the same filters but the fastener ids
+    # None if the trees are not kept or the catalog changed
+    # while selecting the actions
+    if tree_cache is None or catalog_watcher.version != catalog_version:
+        return None
+
+    family = canonical_request({key: value for key, value in reqbody.items()
+                                if key not in ['id', 'options']})
+    branch_tree = tree_cache.get(family, catalog_version)
+    if branch_tree is None:
+        branch_tree = BranchTree(identity_map)
+        tree_cache.put(family, catalog_version, branch_tree)
+    return branch_tree
+
+
+def select_actions(reqbody: Dict):
+    # select the actions for a request in the configured catalog source
+    # return the actions extracted and the identity map to parse them
+    with metrics.timer('build_aggregation_pipeline'):
+        pipeline = build_aggregation_pipeline(reqbody)
+
+    catalog = action_catalog
+    if catalog is not None:
+        with metrics.timer('catalog_lookup'):
+            actions = catalog.extract_actions(pipeline[0]['$match'],
+                                              GLOBAL_ACTION_IDS)
+        # actions parsed once for all the requests on this catalog
+        return actions, catalog.parsed_actions
+    elif closure_index is not None:
+        actions = find_actions(pipeline[0]['$match'], closure_index)
+        return actions, {}
+    else:
+        return aggregate_actions(pipeline), {}
+
+
+def aggregate_actions(pipeline: List[Dict]):
+    # run the aggregation pipeline and extract the actions
+    with metrics.timer('mongo_aggregate'):
+        documents = list(carrier.aggregate(pipeline))
+    with metrics.timer('extract_actions'):
+        return extract_actions(documents)
+
+
+def generate_sequence(process_tree: ActionTree) -> List[Dict]:
+    # generate the sequence of all the actions in the tree
+    with metrics.timer('get_sequence'):
+        sequence = process_tree.get_sequence()
+    if metrics.enabled:
+        metrics.inc('proxy_requests', count_proxy_requests(sequence))
+    return sequence
+
+
+def count_proxy_requests(sequence: List[Dict]) -> int:
+    # count the requests sent to the robot proxy by a sequence
+    return sum(1 for action_sequence in sequence
+               for step in action_sequence['requestSequence']
+               if step['action'] == 'REQUEST')
+
+
+def get_page_args(req):
+    # get the sequence page asked with the offset and limit query args
+    # return None if the whole sequence is asked
+    if 'offset' not in req.args and 'limit' not in req.args:
+        return None
+
+    try:
+        offset = int(req.args.get('offset', 0))
+        limit = req.args.get('limit')
+        limit = int(limit) if limit is not None else None
+    except ValueError:
+        abort(400, 'offset and limit must be integers')
+
+    if offset < 0 or (limit is not None and limit < 0):
+        abort(400, 'offset and limit must be positive')
+
+    return offset, limit
+
+
+def generate_sequence_page(process_tree: ActionTree,
+                           offset: int,
+                           limit: int = None) -> Dict:
+    # generate the sequence of the actions in the page only,
+    # the process tree is built from the actions descriptions
+    # without generating their sequences
+    actions = list(process_tree.iter_actions())
+    total = len(actions)
+    end = total if limit is None else min(offset + limit, total)
+
+    with metrics.timer('get_sequence'):
+        if process_tree.rewrites_sequence:
+            # the page sequences depend on the actions before the page
+            sequence = list(process_tree.iter_sequence(offset, end))
         else:
-            load_tool_id = insert_load_pos_action(process_tree, lul_node.identifier, go_load_tool_pos)
-            prev_loadtool_node_id = load_tool_id
-        
-        prev_node_actype = lul_node.action_type
+            sequence = [a.get_sequence() for a in actions[offset:end]]
+    if metrics.enabled:
+        metrics.inc('proxy_requests', count_proxy_requests(sequence))
+    tree = generate_desc([a.get_stage() for a in actions])
+
+    result = {
+        "status": 'SUCCESS',
+        "sequence": sequence,
+        "processTree": tree,
+        "page": {
+            "offset": offset,
+            "limit": limit,
+            "total": total,
+            # offset of the next page, None if last page
+            "next": end if end < total else None
+        }
+    }
+    if process_tree.planning:
+        result['planning'] = process_tree.planning
+    if process_tree.cycle_time is not None:
+        result['estimatedCycleTime'] = process_tree.cycle_time
+    return result
+
+
+def negotiate_mimetype(req, streamed: bool = True) -> str:
+    # get the response mimetype preferred by the client among json,
+    # the streamed json records if the route streams and the available
+    # binary encodings, json if none of them is accepted
+    mimetypes = [JSON_MIMETYPE, NDJSON_MIMETYPE] if streamed\
+        else [JSON_MIMETYPE]
+    best = req.accept_mimetypes.best_match(mimetypes + binary_mimetypes())
+    return best if best is not None else JSON_MIMETYPE
+
+
+def encode_body(result: Dict,
+                mimetype: str = JSON_MIMETYPE) -> str or bytes:
+    # encode a response body in json or in a binary encoding, the
+    # json as jsonify encodes it (sorted keys, compact separators,
+    # final newline), the same bodies in the two serving modes
+    with metrics.timer('encoding'):
+        if mimetype == JSON_MIMETYPE:
+            return json.dumps(result, sort_keys=True,
+                              separators=(',', ':')) + '\n'
+        return encode_binary(result, mimetype)
+
+
+def generate_ndjson(process_tree: ActionTree):
+    # generate the streamed response lines :
+    # - one {"sequence": ...} record per action in the sequence order
+    # - one {"processTree": ...} record per action group
+    # - a {"planning": ...} record if planning options asked
+    # - a {"estimatedCycleTime": ...} record if asked
+    # - a final {"status": ...} record
+    descriptions = []
+    try:
+        for action_sequence in process_tree.iter_sequence():
+            # keep only the action description for the process tree
+            descriptions.append({
+                "description": action_sequence['description'],
+                "id": action_sequence['id'],
+                "type": action_sequence['type']
+            })
+            if metrics.enabled:
+                metrics.inc('proxy_requests',
+                            count_proxy_requests([action_sequence]))
+            yield encode_ndjson_record({"sequence": action_sequence})
+
+        for group in generate_desc(descriptions):
+            yield encode_ndjson_record({"processTree": group})
+
+        if process_tree.planning:
+            yield encode_ndjson_record({"planning": process_tree.planning})
+
+        if process_tree.cycle_time is not None:
+            yield encode_ndjson_record(
+                {"estimatedCycleTime": process_tree.cycle_time})
+
+        yield encode_ndjson_record({"status": 'SUCCESS'})
+    except Exception as error:
+        # the response status is already sent, report the error in stream
+        yield encode_ndjson_record({"status": 'FAIL', "error": str(error)})
+
+
+def encode_ndjson_record(record: Dict) -> str:
+    return json.dumps(record, separators=(',', ':')) + '\n'
+
+
+def select_batch_actions(reqbodies: List[Dict]):
+    # select the actions for several requests with one database round trip
+    # return the actions extracted for each request
+    # and the identity map to parse them, shared by all the requests
+    matches = [build_match(b) for b in reqbodies]
+
+    catalog = action_catalog
+    if catalog is not None:
+        with metrics.timer('catalog_lookup'):
+            batch_actions = [
+                catalog.extract_actions(
+                    build_selection_pipeline([m])[0]['$match'],
+                    GLOBAL_ACTION_IDS)
+                for m in matches]
+        return batch_actions, catalog.parsed_actions
+
+    pipeline = build_selection_pipeline(matches)
+    if closure_index is not None:
+        actions = find_actions(pipeline[0]['$match'], closure_index)
+    else:
+        actions = aggregate_actions(pipeline)
+
+    # dispatch the root actions between the requests,
+    # the dependences and global actions are shared
+    root_actions, dependences, global_actions = actions
+    batch_actions = [([doc for doc in root_actions
+                       if match_document(doc, m)],
+                      dependences,
+                      global_actions)
+                     for m in matches]
+    return batch_actions, {}
+
+
+def generate_batch_results(batch_actions: List,
+                           identity_map: Dict,
+                           reqbodies: List[Dict]):
+    # build the process tree and the sequence of each request
+    results = []
+    for actions, reqbody in zip(batch_actions, reqbodies):
+        process_tree = build_process_tree(*actions, identity_map,
+                                          reqbody.get('options'))
+        results.append(generate_result(process_tree))
+    return results
+
+
+def generate_result(process_tree: ActionTree) -> Dict:
+    # generate the sequence and the process tree description
+    sequence = generate_sequence(process_tree)
+    result = {
+        "status": 'SUCCESS',
+        "sequence": sequence,
+        "processTree": generate_desc(sequence)
+    }
+    if process_tree.planning:
+        result['planning'] = process_tree.planning
+    if process_tree.cycle_time is not None:
+        result['estimatedCycleTime'] = process_tree.cycle_time
+    return result
 
 
-    # insert a go home and return home node
-    # get the root node
-    root_node = process_tree.get_node(0)
-    # get the root node children
-    root_node_children = process_tree.children(0)
-    # create a go home and return home action node
-    go_home_node = ActionNode(go_home, is_global=True)
-    return_home_node = ActionNode(go_home, is_global=True)
+@metrics.timed('generate_desc')
+def generate_desc(sequence: list):
+    return describe_sequence(sequence)
+
+
+@metrics.timed('build_process_tree')
+def build_process_tree(root_actions: List[Dict],
+                       dependences: Dict[str, Dict],
+                       global_actions: Dict[str, Dict],
+                       identity_map: Dict[str, Action] = None,
+                       options: Dict = None,
+                       branch_tree: BranchTree = None):
+    # each action is parsed once, even if shared by several branches
+    # and by the requests of a family if its tree is kept
+    if branch_tree is not None:
+        identity_map = branch_tree.identity_map
+    elif identity_map is None:
+        identity_map = {}
+    parsed_count = len(identity_map)
+    with metrics.timer('parse'):
+        actions = [Action.parse(ra, dependences, identity_map)
+                   for ra in root_actions]
+        # create global actions
+        go_load_tool_pos = Action.parse(global_actions['load_tool_position'],
+                                        dependences,
+                                        identity_map)
+        go_home = Action.parse(global_actions['home'],
+                               dependences,
+                               identity_map)
+    metrics.inc('actions_parsed', len(identity_map) - parsed_count)
+    # actions = Action.parseList(rootActions, dependences)
 
-    # insert the go home node in root
-    process_tree.add_action_node(go_home_node, parent=root_node)
+    if branch_tree is None:
+        process_tree = ActionTree()
+        process_tree.add_branches(actions)
+    else:
+        # patch the tree of the previous request of the family
+        with metrics.timer('tree_update'):
+            process_tree, patched = branch_tree.update(actions)
+        metrics.inc('tree_patches' if patched else 'tree_rebuilds')
 
-    # move all the root children in go_home node
-    for ch in root_node_children:
-        process_tree.move_node(ch.identifier, go_home_node.identifier)
+    process_tree.tracker_interval = tracker_interval
 
-    # insert the return home node in root
-    process_tree.add_action_node(return_home_node, parent=root_node)
+    # reorganize the tree as asked in the request options
+    if options:
+        with metrics.timer('planning'):
+            plan_process_tree(process_tree, options)
 
-    process_tree.show(key=lambda node: node.sort_key if node.sort_key else 9999)
-    return process_tree
+    # insert go load tool position action before load and unload actions
+    # and the go home and return home actions
+    process_tree.insert_global_actions(go_load_tool_pos, go_home)
 
-def insert_load_pos_action(tree: ActionTree,
-                           target_action_id: int,
-                           go_tool_pos: Action) -> int:
-    node = tree.get_node(target_action_id)
-    node_parent = tree.parent(target_action_id)
-    # create the go to load tool position action as a global action
-    load_tool_node = ActionNode(go_tool_pos, is_global=True)
-    # insert the node in the tree as a tnode_parent children
-    tree.add_action_node(load_tool_node, parent=node_parent)
-    # move the targeted node as a go load tool children
-    tree.move_node(target_action_id, load_tool_node.identifier)
-    return load_tool_node.identifier
+    # estimate the sequence execution time if asked
+    if options and options.get('estimateCycleTime'):
+        with metrics.timer('cycle_time'):
+            process_tree.cycle_time = estimate_cycle_time(
+                process_tree.iter_actions(), cycle_time_model)
 
+    metrics.inc('tree_nodes', len(process_tree))
+    return process_tree
 
-def extract_actions(cmdCursor: Cursor):
 
-    global_ids = ['home', 'load_tool_position']
+def extract_actions(cmdCursor: Cursor):
 
     dependences = {}
     global_actions = {}
     root_actions = []
     for doc in cmdCursor:
-        if doc['_id'] in global_ids:
+        if doc['_id'] in GLOBAL_ACTION_IDS:
             global_actions[doc['_id']] = doc
         else:
             if 'graphLookUp' in doc:
@@ -290,7 +804,32 @@ def extract_actions(cmdCursor: Cursor):
     return root_actions, dependences, global_actions
 
 
+@metrics.timed('closure_lookup')
+def find_actions(query: Dict, closures: ClosureIndex):
+    # get the root and global actions matching the query
+    # then their dependences from the precomputed closures
+    # return the same data as extract_actions
+    global_actions = {}
+    root_actions = []
+    for doc in carrier.find(query):
+        if doc['_id'] in GLOBAL_ACTION_IDS:
+            global_actions[doc['_id']] = doc
+        else:
+            root_actions.append(doc)
+
+    dep_ids = closures.closure(doc['_id'] for doc in root_actions)
+    dependences = {str(doc['_id']): doc
+                   for doc in carrier.find({'_id': {'$in': dep_ids}})}
+
+    return root_actions, dependences, global_actions
+
+
 def build_aggregation_pipeline(reqbody: Dict):
+    return build_selection_pipeline([build_match(reqbody)])
+
+
+def build_match(reqbody: Dict) -> Dict:
+    # build the query selecting the root actions of a request
 
     match = {
         "type": ActionType[reqbody['actionType']].value,
@@ -323,11 +862,16 @@ def build_aggregation_pipeline(reqbody: Dict):
     if position:
         match["targeted_area.position"] = {"$in": position}
 
+    return match
+
+
+def build_selection_pipeline(matches: List[Dict]):
+
     match_operation = {
         "$match": {'$or': [
-                    match, {
+                    *matches, {
                     '_id': {
-                        '$in': ['home', 'load_tool_position']
+                        '$in': GLOBAL_ACTION_IDS
                     }
                 }
             ]
@@ -346,46 +890,6 @@ def build_aggregation_pipeline(reqbody: Dict):
 
     return [match_operation, graphlookup_operation]
 
-def action_group_generator(sequence):
-    li = 0  # var to store index
-    # var to store action sequence
-    # generate list from sequence adding target information
-    seq_list = [{"target": get_action_target(a['type']), "action":a}\
-                for a in sequence]
-    # var to store group, init with target index 0
-    group = seq_list[0]['target']
-
-    # while index < sequence end
-    while li < len(seq_list):
-        step_stages = []  # var to store stages
-
-        # while action target is same add action in step_stages
-        while seq_list[li]['target'] == group:
-            a = seq_list[li]['action']
-            # append object describing action on step_stages
-            step_stages.append(
-                {
-                 "description": a['description'],
-                 "id": a['id'],
-                 "type": a['type']
-                }
-            )
-            li += 1  # increment index
-
-            # if end on sequence break the loop
-            if li >= len(seq_list):
-                break
-        
-        # when quit the loop (target change or end of sequence)
-        # yield object with group and step_changes
-        yield {"target": group,
-               "stepStages": step_stages}
-
-        # update group if not the end of sequence
-        if li < len(seq_list):
-            group = seq_list[li]['target']
-        
-
 
 if __name__ == '__main__':
     server.run(host=server_host, port=server_port)
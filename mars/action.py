@@ -146,10 +146,15 @@ class Dependence:
         }
 
     @staticmethod
-    def parse(serialize_dep: Dict, serialise_dependences_obj: Dict):
+    def parse(serialize_dep: Dict, serialise_dependences_obj: Dict,
+              identity_map: Optional[Dict[str, 'Action']] = None,
+              parsing: Optional[Dict[str, 'Action']] = None):
         dep_action_id = str(serialize_dep['action'])
         ser_action = serialise_dependences_obj[dep_action_id]
-        action = Action.parse(ser_action, serialise_dependences_obj)
+        action = Action.parse(ser_action,
+                              serialise_dependences_obj,
+                              identity_map,
+                              parsing)
 
         dtype = DependenceType[serialize_dep['type']]
         return Dependence(action, dtype)
@@ -437,9 +442,78 @@ class Action:
 
     @staticmethod
     def parse(serialize_action: Dict,
-              serialise_dependences_obj: Dict) -> 'Action':
-        _type: EnumPriorityInterface = ActionType[serialize_action['type']]
+              serialise_dependences_obj: Dict,
+              identity_map: Optional[Dict[str, 'Action']] = None,
+              parsing: Optional[Dict[str, 'Action']] = None)\
+            -> 'Action':
+        """ parse a serialized action and its dependences
+
+        Args:
+            serialize_action (Dict): the serialized action
+            serialise_dependences_obj (Dict): the serialized dependences
+                actions indexed by id
+            identity_map (Dict[str, Action], optional): the actions already
+                parsed indexed by id, an action shared by several others
+                is parsed only once. Defaults to None, a new map.
+            parsing (Dict[str, Action], optional): the actions whose
+                dependences are being parsed, a dependence cycle is linked
+                to them. Defaults to None, internal use.
+
+        Returns:
+            Action: the parsed action
+        """
+        if identity_map is None:
+            identity_map = {}
+        if parsing is None:
+            parsing = {}
+
+        id = str(serialize_action['_id'])
+        if id in identity_map:
+            return identity_map[id]
+        elif id in parsing:
+            # dependence cycle, reported by the scheduler
+            return parsing[id]
+
+        # depth first parsing with an explicit stack, the dependences
+        # chains can be deeper than the recursion limit.
+        # an action is created without dependences and kept in parsing
+        # while its dependences are parsed, a dependence cycle is linked
+        # to it. it is published in the identity map once complete,
+        # it can then be shared with other threads
+        action = Action.__parse_action(serialize_action)
+        parsing[id] = action
+        stack = [(action, iter(serialize_action['dependences']), [])]
+        while stack:
+            current, ser_deps, dependences = stack[-1]
+            ser_dep = next(ser_deps, None)
+            if ser_dep is None:
+                stack.pop()
+                current.dependences = dependences
+                del parsing[current.id]
+                identity_map[current.id] = current
+                continue
+
+            ser_action = serialise_dependences_obj[str(ser_dep['action'])]
+            dep_id = str(ser_action['_id'])
+            dep_action = identity_map.get(dep_id)
+            if dep_action is None:
+                dep_action = parsing.get(dep_id)
+            if dep_action is None:
+                dep_action = Action.__parse_action(ser_action)
+                parsing[dep_id] = dep_action
+                stack.append((dep_action,
+                              iter(ser_action['dependences']), []))
+
+            dependences.append(
+                Dependence(dep_action, DependenceType[ser_dep['type']]))
+
+        return action
+
+    @staticmethod
+    def __parse_action(serialize_action: Dict) -> 'Action':
+        # parse a serialized action without its dependences
         id = str(serialize_action['_id'])
+        _type: EnumPriorityInterface = ActionType[serialize_action['type']]
         work_order = serialize_action.get('work_order')
 
         if _type.definition_type == 'MOVE':
@@ -453,13 +527,10 @@ class Action:
 
         description = serialize_action['description']
 
-        dependences = [Dependence.parse(ser_dep, serialise_dependences_obj)\
-                       for ser_dep in serialize_action['dependences']]
-
         return Action(id, _type,
                       definition,
                       description,
-                      dependences,
+                      [],
                       work_order)
 
     def to_dict(self):
@@ -479,6 +550,19 @@ class Action:
 
         return d_action
 
+    def get_stage(self):
+        """ get the action description used in the process tree,
+            without generating the action sequence
+
+        Returns:
+            Dict: the action id, type and description
+        """
+        return {
+            "description": self.__description,
+            "id": self.__id,
+            "type": self.__type.value[1]
+        }
+
     def get_sequence(self):
         sequence = {
             "id": self.__id,
@@ -1,47 +1,99 @@
+import itertools
 
 from mars.action import Action
-from treelib import Tree, Node
-from typing import List
-from mars.action import DependenceType
+from typing import Dict, List
+import mars.proxyapi as proxyapi
+from mars.registers import RegisterWriteFilter
+from mars.scheduler import DependenceScheduler
+from mars.tracker import ProgramTracker
 
+# identifiers of the global action nodes
+_global_ids = itertools.count(1)
 
-class ActionNode(Node):
+
+def node_sort_key(node: 'ActionNode'):
+    """ get the key sorting the children of a node in the sequence,
+        the work order, the nodes without work order at the end
+
+    Args:
+        node (ActionNode): the node
+
+    Returns:
+        the sort key
+    """
+    return node.sort_key if node.sort_key else 9999
+
+
+# types of the actions preceded by a go load tool position action
+TOOL_CHANGE_TYPES = ['LOAD.EFFECTOR', 'UNLOAD.EFFECTOR']
+
+
+class ActionNode:
     """ class used to represent a tree node containing an Action as data
-        it inherit from treelib.Node class
+
+        the node links to its parent, its first and last children
+        and its siblings, so adding, moving and traversing nodes
+        need no lookup. the attributes are stored in slots.
 
     Attributes
     ----------
+    identifier : object
+        the node identifier in the tree, the action id
+        or a generated identifier for the global actions
+    tag : str
+        the node name, the action description
+    data : Action or None
+        the action, None for the root node
     priority : int
         the action priority
+    action_type : str or None
+        the action type, None for the root node
 
     """
+    __slots__ = ('identifier', 'tag', 'data', 'priority', 'sort_key',
+                 'action_type',
+                 '_parent', '_first_child', '_last_child',
+                 '_prev_sibling', '_next_sibling')
+
     def __init__(self, action: Action = None, is_global: bool= False) -> 'ActionNode':
         """ActionNode initializer
 
         Args:
             action (Action, optional): The action represented
             by the node in the tree. Defaults to None.
+            is_global (bool, optional): True if the action can be
+            inserted several times in the tree. Defaults to False.
         """
 
-        ''' usage of treelib.Node.__init__() with
-            the action.description as Node name attribute
-            action.id as Node id attribute
-            and the action object as data
+        ''' the action.description as node name,
+            action.id as node identifier (a generated one for the
+            global actions) and the action object as data
 
             if no action, 'root' as name and 0 as id.
         '''
 
-        super(ActionNode, self).__init__()
-        
+        self._parent: ActionNode or None = None
+        self._first_child: ActionNode or None = None
+        self._last_child: ActionNode or None = None
+        self._prev_sibling: ActionNode or None = None
+        self._next_sibling: ActionNode or None = None
+
         if action:
             self.data = action
             self.tag = action.description
-            if not is_global:
-                self.identifier = action.id
+            self.identifier = 'global-{n}'.format(n=next(_global_ids))\
+                if is_global else action.id
+            # the action attributes are read only, cache them
+            self.priority = action.priority
+            self.sort_key = action.work_order
+            self.action_type = action.type
         else:
+            self.data = None
             self.tag = 'root'
             self.identifier = 0
-
+            self.priority = 0
+            self.sort_key = None
+            self.action_type = None
 
     def __lt__(self, node: 'ActionNode') -> bool:
 
@@ -80,72 +132,310 @@ class ActionNode(Node):
         """
         return True if self.priority == node.priority else False
 
-    @property
-    def sort_key(self):
-        return self.data.work_order
+    def __repr__(self) -> str:
+        return 'ActionNode(tag={tag!r}, identifier={nid!r})'\
+            .format(tag=self.tag, nid=self.identifier)
 
-    @property
-    def priority(self) -> int:
-        """ get the action priority
+    def iter_children(self):
+        """ generate the node children in insertion order
 
-        Returns:
-            int: the action priority
+        Yields:
+            ActionNode: the child node
         """
-
-        if self.data:
-            return self.data.priority
+        child = self._first_child
+        while child is not None:
+            yield child
+            child = child._next_sibling
+
+    def _append_child(self, child: 'ActionNode'):
+        child._parent = self
+        child._prev_sibling = self._last_child
+        child._next_sibling = None
+        if self._last_child is None:
+            self._first_child = child
         else:
-            return 0
-
-    @property
-    def action_type(self) -> str or None:
-        if self.data:
-            return self.data.type
+            self._last_child._next_sibling = child
+        self._last_child = child
+
+    def _insert_child_before(self, child: 'ActionNode',
+                             sibling: 'ActionNode'):
+        child._parent = self
+        child._prev_sibling = sibling._prev_sibling
+        child._next_sibling = sibling
+        if sibling._prev_sibling is None:
+            self._first_child = child
+        else:
+            sibling._prev_sibling._next_sibling = child
+        sibling._prev_sibling = child
+
+    def _copy(self) -> 'ActionNode':
+        # copy of the node attributes, without the links
+        node = ActionNode.__new__(ActionNode)
+        node.identifier = self.identifier
+        node.tag = self.tag
+        node.data = self.data
+        node.priority = self.priority
+        node.sort_key = self.sort_key
+        node.action_type = self.action_type
+        node._parent = node._first_child = node._last_child = None
+        node._prev_sibling = node._next_sibling = None
+        return node
+
+    def _detach(self):
+        parent = self._parent
+        if self._prev_sibling is None:
+            parent._first_child = self._next_sibling
         else:
-            return None
+            self._prev_sibling._next_sibling = self._next_sibling
+        if self._next_sibling is None:
+            parent._last_child = self._prev_sibling
+        else:
+            self._next_sibling._prev_sibling = self._prev_sibling
+        self._parent = self._prev_sibling = self._next_sibling = None
+
 
 def getDependences(action):
-    alist = listDependences(action, action.priority)
-    alist.sort(key=lambda item: item[0])
-    return [a[1] for a in alist]
-    # return alist
-
-
-def listDependences(action, dn=0):
-    alist = [(dn, action)]
-    for dep in action.dependences:
-        if dep.dependence_type == DependenceType.UPSTREAM :
-            alist.extend(listDependences(dep.action, dep.action.priority))
-        elif dep.dependence_type == DependenceType.DOWNSTREAM :
-            alist.extend(listDependences(dep.action, 9999-dep.action.priority))
-        else :
-            raise Exception("unknow dependence type")
-    return alist
-
-'''
-def listDependences(action, dn=0):
-    alist = [(dn, action)]
-    for a in action.upstream_dependences:
-        alist.extend(Dependencies.__listDependences(a, a.priority))
-    for a in action.downstream_dependences:
-        alist.extend(Dependencies.__listDependences(a, 9999-a.priority))
-    return alist
-'''
-
-
-class ActionTree(Tree):
+    return DependenceScheduler().schedule(action)
+
+
+class ActionTree:
     """ class used to represent a tree containing ActionNode.
-        it inherit form treelib.Tree class
+
+        the nodes are indexed by identifier in insertion order,
+        the children of a node are kept in insertion order
+        (a moved node becomes the last child of its new parent)
+
+    Attributes
+    ----------
+    planning : Dict
+        report of the planning passes applied on the tree
+    cycle_time : Dict
+        estimated execution time of the sequence, None if not estimated
+    eliminate_redundant_writes : bool
+        True to remove from the sequence the register writes and the
+        program launches which would not change the controller state
+    persistent_tracker : bool
+        True to subscribe the program end tracker once for the whole
+        sequence instead of once per program launch
+    tracker_interval : int
+        polling interval of the program end tracker (ms)
     """
 
     def __init__(self):
         """ActionTree initializer
         """
-        # usage of treelib.Tree.__init__ to initialize Tree
-        super(ActionTree, self).__init__()
+        self._nodes: Dict[object, ActionNode] = {}
+        # effector load and unload nodes in insertion order
+        self._tool_nodes: List[ActionNode] = []
+        self.root: object = None
+        self.planning: Dict = {}
+        self.cycle_time: Dict = None
+        self.eliminate_redundant_writes: bool = False
+        self.persistent_tracker: bool = False
+        self.tracker_interval: int = proxyapi.TRACKER_INTERVAL
         # add a root ActionNode in the tree
         self.add_node(ActionNode())
 
+    def __len__(self) -> int:
+        return len(self._nodes)
+
+    def __contains__(self, nid: object) -> bool:
+        return nid in self._nodes
+
+    def __getitem__(self, nid: object) -> ActionNode:
+        return self._nodes[nid]
+
+    def contains(self, nid: object) -> bool:
+        """ check if a node is in the tree
+
+        Args:
+            nid (object): the node identifier
+
+        Returns:
+            bool: True if the node is in the tree
+        """
+        return nid in self._nodes
+
+    def get_node(self, nid: object) -> ActionNode or None:
+        """ get a node from its identifier
+
+        Args:
+            nid (object): the node identifier
+
+        Returns:
+            ActionNode or None: the node, None if not in the tree
+        """
+        return self._nodes.get(nid)
+
+    def all_nodes(self) -> List[ActionNode]:
+        return list(self._nodes.values())
+
+    def add_node(self, node: ActionNode, parent: ActionNode or object = None):
+        """ add a node in the tree as the last child of its parent
+
+        Args:
+            node (ActionNode): the node to add
+            parent (ActionNode or object, optional): the parent node or its
+            identifier, None to add the root node. Defaults to None.
+
+        Raises:
+            ValueError: if the node is already in the tree,
+            if the tree already has a root
+            KeyError: if the parent is not in the tree
+        """
+        if node.identifier in self._nodes:
+            raise ValueError("node {nid} already in the tree"
+                             .format(nid=node.identifier))
+
+        if parent is None:
+            if self.root is not None:
+                raise ValueError("the tree already has a root")
+            self.root = node.identifier
+        else:
+            pid = parent.identifier if isinstance(parent, ActionNode)\
+                else parent
+            self._nodes[pid]._append_child(node)
+
+        self._nodes[node.identifier] = node
+        if node.action_type in TOOL_CHANGE_TYPES:
+            self._tool_nodes.append(node)
+
+    def remove_node(self, nid: object):
+        """ remove a node without children from the tree
+
+        Args:
+            nid (object): the node identifier
+
+        Raises:
+            KeyError: if the node is not in the tree
+            ValueError: if the node is the root or has children
+        """
+        node = self._nodes[nid]
+        if node._parent is None or node._first_child is not None:
+            raise ValueError("can't remove node {nid}, root or with children"
+                             .format(nid=nid))
+
+        node._detach()
+        del self._nodes[nid]
+        if node.action_type in TOOL_CHANGE_TYPES:
+            # the nodes compare their priority, remove by identity
+            self._tool_nodes = [n for n in self._tool_nodes if n is not node]
+
+    def parent(self, nid: object) -> ActionNode or None:
+        """ get the parent of a node
+
+        Args:
+            nid (object): the node identifier
+
+        Returns:
+            ActionNode or None: the parent node, None for the root
+        """
+        return self._nodes[nid]._parent
+
+    def children(self, nid: object) -> List[ActionNode]:
+        """ get the children of a node
+
+        Args:
+            nid (object): the node identifier
+
+        Returns:
+            List[ActionNode]: the children in insertion order
+        """
+        return list(self._nodes[nid].iter_children())
+
+    def is_ancestor(self, ancestor: object, grandchild: object) -> bool:
+        """ check if a node is an ancestor of another one
+
+        Args:
+            ancestor (object): the ancestor identifier
+            grandchild (object): the descendant identifier
+
+        Returns:
+            bool: True if ancestor is a parent of grandchild, directly or not
+        """
+        node = self._nodes[grandchild]._parent
+        while node is not None:
+            if node.identifier == ancestor:
+                return True
+            node = node._parent
+        return False
+
+    def move_node(self, source: object, destination: object,
+                  before: object = None):
+        """ move a node and its subtree as the last child of another node,
+            or before one of its children
+
+        Args:
+            source (object): identifier of the node to move
+            destination (object): identifier of the new parent
+            before (object, optional): identifier of the child of the new
+                parent the node is moved before. Defaults to None.
+
+        Raises:
+            KeyError: if a node is not in the tree
+            ValueError: if the destination is in the source subtree,
+            if before is not a child of the destination
+        """
+        node = self._nodes[source]
+        new_parent = self._nodes[destination]
+        if source == destination or self.is_ancestor(source, destination):
+            raise ValueError("can't move node {src} in its own subtree"
+                             .format(src=source))
+
+        if before is None:
+            node._detach()
+            new_parent._append_child(node)
+            return
+
+        sibling = self._nodes[before]
+        if sibling._parent is not new_parent or sibling is node:
+            raise ValueError("node {nid} is not another child of {dst}"
+                             .format(nid=before, dst=destination))
+        node._detach()
+        new_parent._insert_child_before(node, sibling)
+
+    def filter_nodes(self, func):
+        """ filter the tree nodes
+
+        Args:
+            func (Callable[[ActionNode], bool]): the filter function
+
+        Returns:
+            Iterator[ActionNode]: the nodes accepted by the filter,
+            in insertion order
+        """
+        return filter(func, self._nodes.values())
+
+    def expand_tree(self, nid: object = None, key=None, reverse: bool = False):
+        """ traverse the tree depth first, the children of each node
+            being sorted with the key function (stable sort)
+
+        Args:
+            nid (object, optional): identifier of the first node,
+            the root if None. Defaults to None.
+            key (Callable[[ActionNode], object], optional): children
+            sort key, the children are compared if None. Defaults to None.
+            reverse (bool, optional): reverse the children order.
+            Defaults to False.
+
+        Yields:
+            object: the nodes identifiers in traversal order
+        """
+        node = self._nodes[self.root if nid is None else nid]
+        yield node.identifier
+
+        stack = []
+        while True:
+            children = list(node.iter_children())
+            if children:
+                children.sort(key=key, reverse=reverse)
+                children.reverse()
+                stack.extend(children)
+            if not stack:
+                return
+            node = stack.pop()
+            yield node.identifier
+
     def add_action_node(self, action_node: ActionNode, parent: ActionNode or None):
         """ add an ActionNode in the tree if not allready exist
         (id already present)
@@ -159,42 +449,210 @@ class ActionTree(Tree):
         if not self.contains(action_node.identifier):
             self.add_node(action_node, parent=parent)
 
-    def add_action_nodes(self, actions: List[ActionNode]):
+    def add_action_nodes(self, actions: List[ActionNode]) -> List[ActionNode]:
         """ add list of actions
 
         Args:
             actions (List[ActionNode]): [description]
+
+        Returns:
+            List[ActionNode]: the nodes added, the actions already
+            in the tree being skipped
         """
 
         current = self.get_node(0)
         action_nodes = [ActionNode(an) for an in actions]
+        added = []
 
         for an in action_nodes:
             parent = self.__getParent(an, current)
-            self.add_action_node(an, parent)
+            if not self.contains(an.identifier):
+                self.add_node(an, parent=parent)
+                added.append(an)
             current = an
 
-    def __getParent(self, actual_node: ActionNode, previous_node: ActionNode):
-
-        if actual_node == previous_node:
-            parent = self.parent(previous_node.identifier)
+        return added
 
-        elif actual_node < previous_node:
-            parent = previous_node
+    def __getParent(self, actual_node: ActionNode, previous_node: ActionNode):
+        # climb from the previous node of the branch, in a loop :
+        # the deep trees would exceed the recursion limit
+        while True:
+            if actual_node == previous_node:
+                return self.parent(previous_node.identifier)
 
-        else:
-            parent = self.__getParent(actual_node,
-                                      self.parent(previous_node.identifier))
+            elif actual_node < previous_node:
+                return previous_node
 
-        return parent
+            previous_node = self.parent(previous_node.identifier)
 
     def add_branch_for_action(self, branch_end: Action):
         dl = getDependences(branch_end)
         self.add_action_nodes(dl)
 
+    def add_branches(self, branch_ends: List[Action]):
+        """ add the branch of each action, the dependences closures
+            being ordered by the same scheduler. each closure is ordered
+            and walked whole, its dependences already in the tree placing
+            the new nodes
+
+        Args:
+            branch_ends (List[Action]): the branches end actions
+
+        Raises:
+            DependenceCycleError: if the dependences contain a cycle
+        """
+        for dl in DependenceScheduler().schedule_all(branch_ends):
+            self.add_action_nodes(dl)
+
+    def sort_tool_nodes(self, key):
+        """ sort the effector load and unload nodes, kept in insertion
+            order, in the order used by the global actions insertion
+
+        Args:
+            key (Callable[[ActionNode], object]): the sort key function
+        """
+        self._tool_nodes.sort(key=key)
+
+    def copy(self) -> 'ActionTree':
+        """ copy the tree structure, the copy nodes share the actions
+            of the tree nodes
+
+        Returns:
+            ActionTree: the copy
+        """
+        tree = ActionTree.__new__(ActionTree)
+        tree._nodes = {nid: node._copy() for nid, node in self._nodes.items()}
+        for nid, node in self._nodes.items():
+            parent = tree._nodes[nid]
+            for child in node.iter_children():
+                parent._append_child(tree._nodes[child.identifier])
+        tree._tool_nodes = [tree._nodes[node.identifier]
+                            for node in self._tool_nodes]
+        tree.root = self.root
+        tree.planning = dict(self.planning)
+        tree.cycle_time = self.cycle_time
+        tree.eliminate_redundant_writes = self.eliminate_redundant_writes
+        tree.persistent_tracker = self.persistent_tracker
+        tree.tracker_interval = self.tracker_interval
+        return tree
+
+    def insert_global_actions(self, go_load_tool_pos: Action, go_home: Action):
+        """ insert the global actions in one pass on the effector nodes :
+            - a go load tool position node becomes the parent of each
+            effector load or unload node, a load following an unload
+            shares the node of the unload
+            - a go home node becomes the parent of all the root children,
+            a return home node is added at the end
+
+        Args:
+            go_load_tool_pos (Action): the go load tool position action
+            go_home (Action): the go home action
+        """
+        load_tool_node = None
+        prev_type = None
+        for node in list(self._tool_nodes):
+            action_type = node.action_type
+            if action_type == 'LOAD.EFFECTOR'\
+                    and prev_type == 'UNLOAD.EFFECTOR':
+                node._detach()
+                load_tool_node._append_child(node)
+            else:
+                # appended to the node parent, then the node moved in it
+                load_tool_node = ActionNode(go_load_tool_pos, is_global=True)
+                self.add_node(load_tool_node, node._parent)
+                node._detach()
+                load_tool_node._append_child(node)
+            prev_type = action_type
+
+        # the go home node takes the whole children list of the root
+        root = self._nodes[self.root]
+        go_home_node = ActionNode(go_home, is_global=True)
+        go_home_node._first_child = root._first_child
+        go_home_node._last_child = root._last_child
+        for child in go_home_node.iter_children():
+            child._parent = go_home_node
+        root._first_child = root._last_child = None
+
+        self.add_node(go_home_node, root)
+        self.add_node(ActionNode(go_home, is_global=True), root)
+
+    def iter_actions(self):
+        """ generate the actions in the tree traversal order,
+            without the root node
+
+        Yields:
+            Action: the action
+        """
+        expanded = self.expand_tree(key=node_sort_key)
+        nodes = self._nodes
+        for nid in expanded:
+            action = nodes[nid].data
+            # the root node has no action
+            if action is not None:
+                yield action
+
+    @property
+    def rewrites_sequence(self) -> bool:
+        """ True if the actions sequences are rewritten in the sequence
+            order, iter_sequence then generates the sequences of a range
+            of actions
+        """
+        return self.eliminate_redundant_writes\
+            or self.__program_tracker().rewrites
+
+    def iter_sequence(self, start: int = 0, stop: int = None):
+        """ generate the actions sequences in the tree traversal order,
+            each sequence is computed when the traversal reaches its action
+
+            with eliminate_redundant_writes the register state is followed
+            from the first action, the sequences before start are computed
+            but not generated, and the number of proxy requests removed
+            from the generated sequences is reported in
+            planning['redundantRequestsRemoved'] once all are generated.
+            the program end tracker requests are then set as asked by
+            persistent_tracker and tracker_interval.
+
+        Args:
+            start (int, optional): index of the first action.
+                Defaults to 0.
+            stop (int, optional): index after the last action, None for
+                the last action of the tree. Defaults to None.
+
+        Yields:
+            Dict: the action sequence
+        """
+        writes = RegisterWriteFilter() if self.eliminate_redundant_writes\
+            else None
+        tracker = self.__program_tracker()
+        if not tracker.rewrites:
+            tracker = None
+        # the root node has no action
+        last = len(self._nodes) - 2
+        # the register state depends on the actions before start
+        first = 0 if writes is not None else start
+        # requests removed before the first generated action
+        skipped = None
+
+        actions = itertools.islice(self.iter_actions(), first, stop)
+        for index, action in enumerate(actions, first):
+            action_sequence = action.get_sequence()
+            if writes is not None:
+                if index == start:
+                    skipped = writes.removed
+                action_sequence = writes.filter(action_sequence)
+                if index < start:
+                    continue
+            if tracker is not None:
+                action_sequence = tracker.filter(action_sequence,
+                                                 index == 0, index == last)
+            yield action_sequence
+
+        if writes is not None:
+            self.planning['redundantRequestsRemoved'] = \
+                0 if skipped is None else writes.removed - skipped
+
+    def __program_tracker(self) -> ProgramTracker:
+        return ProgramTracker(self.tracker_interval, self.persistent_tracker)
+
     def get_sequence(self):
-        expanded = self.expand_tree(key=lambda node: node.sort_key if node.sort_key else 9999)
-        sequence = [self.get_node(nid).data for nid in expanded]
-        sequence.remove(None)
-        sequence = [d.get_sequence() for d in sequence]
-        return sequence
+        return list(self.iter_sequence())
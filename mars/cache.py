@@ -0,0 +1,320 @@
+from collections import OrderedDict
+import json
+import logging
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from pymongo.collection import Collection
+from pymongo.errors import OperationFailure, PyMongoError
+
+# request keys used as $in filters, their order is not significant
+IN_FILTER_KEYS = ['id', 'reference', 'area', 'side', 'position']
+
+_logger = logging.getLogger(__name__)
+
+
+def canonical_request(reqbody: Dict) -> str:
+    """ get a canonical string representation of a sequence request body,
+        two bodies selecting the same actions get the same representation
+
+    Args:
+        reqbody (Dict): the sequence request body
+
+    Returns:
+        str: the canonical representation
+    """
+    return json.dumps(_normalize(reqbody),
+                      sort_keys=True,
+                      separators=(',', ':'))
+
+
+def _normalize(value, key: str = None):
+    if isinstance(value, dict):
+        normalized = {}
+        for k, v in value.items():
+            nv = _normalize(v, k)
+            # empty filters are ignored by the aggregation pipeline
+            if nv is None or nv == [] or nv == {}:
+                continue
+            normalized[k] = nv
+        return normalized
+    elif isinstance(value, list):
+        items = [_normalize(v) for v in value]
+        if key in IN_FILTER_KEYS:
+            # $in lists -> order and duplicates not significant
+            items = sorted(set(items), key=lambda i: (str(type(i)), i))
+        return items
+    elif isinstance(value, float) and value.is_integer():
+        # 1.0 and 1 select the same documents
+        return int(value)
+    else:
+        return value
+
+
+class SequenceCache:
+    """ class used to represent a bounded LRU cache of sequence responses
+        the entries are tagged with the catalog version used to build them
+
+    Attributes
+    ----------
+    maxsize : int
+        maximum number of cached responses
+    hits : int
+        number of requests served from the cache
+    misses : int
+        number of requests not found in the cache
+    evictions : int
+        number of responses evicted to respect the maxsize
+    invalidations : int
+        number of cache flush caused by a catalog change
+    """
+
+    def __init__(self, maxsize: int = 128) -> 'SequenceCache':
+        """SequenceCache initializer
+
+        Args:
+            maxsize (int, optional): maximum number of cached responses.
+                Defaults to 128.
+        """
+        self.__maxsize: int = maxsize
+        self.__entries: OrderedDict = OrderedDict()
+        self.__version: int = 0
+        self.__lock = threading.Lock()
+
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+        self.invalidations: int = 0
+
+    @property
+    def maxsize(self) -> int:
+        return self.__maxsize
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+    def get(self, key: str, version: int) -> Optional[object]:
+        """ get a cached response
+
+        Args:
+            key (str): canonical request
+            version (int): actual catalog version
+
+        Returns:
+            object or None: the cached response, None if not in cache
+        """
+        with self.__lock:
+            self.__check_version(version)
+            value = self.__entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+
+            self.__entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: str, version: int, value: object):
+        """ add a response in the cache
+
+        Args:
+            key (str): canonical request
+            version (int): catalog version used to build the response
+            value (object): the response
+        """
+        with self.__lock:
+            self.__check_version(version)
+            # response built on an outdated catalog -> not cached
+            if version != self.__version:
+                return
+
+            self.__entries[key] = value
+            self.__entries.move_to_end(key)
+            while len(self.__entries) > self.__maxsize:
+                self.__entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """ remove all the cached responses
+        """
+        with self.__lock:
+            self.__entries.clear()
+
+    def stats(self) -> Dict:
+        """ get the cache counters
+
+        Returns:
+            Dict: cache size and hit/miss/eviction/invalidation counters
+        """
+        return {
+            "size": len(self.__entries),
+            "maxsize": self.__maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations
+        }
+
+    def __check_version(self, version: int):
+        # flush the entries built on an older catalog
+        if version > self.__version:
+            if self.__entries:
+                self.__entries.clear()
+                self.invalidations += 1
+            self.__version = version
+
+
+class CatalogWatcher:
+    """ class used to follow the changes of the action catalog collection
+        and maintain a catalog version counter
+
+        use a change stream on the collection if the mongodb server
+        supports it (replica set), else poll the collection hash.
+
+    Attributes
+    ----------
+    version : int
+        the catalog version, incremented on each detected change
+    mode : str or None
+        'changestream', 'polling' or None if no change detection available
+    """
+
+    def __init__(self, collection: Collection,
+                 poll_interval: float = 5.0) -> 'CatalogWatcher':
+        """CatalogWatcher initializer
+
+        Args:
+            collection (Collection): the action catalog collection
+            poll_interval (float, optional): delay in seconds between
+                two collection hash checks in polling mode. Defaults to 5.0.
+        """
+        self.__collection: Collection = collection
+        self.__poll_interval: float = poll_interval
+        self.__listeners: List[Callable] = []
+        self.__stop = threading.Event()
+        self.__thread: Optional[threading.Thread] = None
+        self.__lock = threading.Lock()
+
+        self.version: int = 0
+        self.mode: Optional[str] = None
+
+    def add_listener(self, listener: Callable[[Optional[Dict]], None]):
+        """ add a function called on each catalog change
+
+        Args:
+            listener (Callable): function called with the change event,
+                None if the changed document is unknown (polling mode)
+        """
+        self.__listeners.append(listener)
+
+    def bump(self, change: Optional[Dict] = None) -> bool:
+        """ notify the listeners and increment the catalog version
+
+            a listener error is logged and does not stop the other
+            listeners, the version is incremented in any case so the
+            caches depending on it are invalidated
+
+        Args:
+            change (Dict, optional): the change stream event.
+                Defaults to None.
+
+        Returns:
+            bool: True if all the listeners succeeded
+        """
+        # listeners first, so a request reading the new version
+        # always uses the data refreshed by the listeners
+        succeeded = True
+        for listener in self.__listeners:
+            try:
+                listener(change)
+            except Exception:
+                _logger.exception('catalog change listener %s failed',
+                                  getattr(listener, '__name__', listener))
+                succeeded = False
+        with self.__lock:
+            self.version += 1
+        return succeeded
+
+    def start(self) -> Optional[str]:
+        """ detect the available change detection mode
+            and start the watching thread
+
+        Returns:
+            str or None: the change detection mode,
+                None if no mode available
+        """
+        self.mode = self.__detect_mode()
+        if self.mode:
+            self.__thread = threading.Thread(target=self.__run,
+                                             name='catalog-watcher',
+                                             daemon=True)
+            self.__thread.start()
+        return self.mode
+
+    def stop(self):
+        """ stop the watching thread
+        """
+        self.__stop.set()
+
+    def __detect_mode(self) -> Optional[str]:
+        try:
+            with self.__collection.watch(max_await_time_ms=1):
+                return 'changestream'
+        except (OperationFailure, NotImplementedError):
+            pass
+
+        try:
+            self.__hash = self.__collection_hash()
+            return 'polling'
+        except (OperationFailure, NotImplementedError):
+            return None
+
+    def __collection_hash(self) -> str:
+        database = self.__collection.database
+        result = database.command('dbHash',
+                                  collections=[self.__collection.name])
+        return result['collections'].get(self.__collection.name)
+
+    def __run(self):
+        if self.mode == 'changestream':
+            self.__watch()
+        else:
+            self.__poll()
+
+    def __watch(self):
+        # time of the next full refresh retry after a listener failure,
+        # the failed change being no longer in the stream
+        retry_at = None
+        while not self.__stop.is_set():
+            try:
+                with self.__collection.watch(full_document='updateLookup',
+                                             max_await_time_ms=1000)\
+                        as stream:
+                    while not self.__stop.is_set() and stream.alive:
+                        change = stream.try_next()
+                        if change is not None:
+                            if not self.bump(change) and retry_at is None:
+                                retry_at = time.monotonic()\
+                                    + self.__poll_interval
+                        elif retry_at is not None\
+                                and time.monotonic() >= retry_at:
+                            retry_at = None if self.bump()\
+                                else time.monotonic() + self.__poll_interval
+            except PyMongoError:
+                # changes can be missed during the reconnection
+                # so consider the catalog modified
+                retry_at = None if self.bump()\
+                    else time.monotonic() + self.__poll_interval
+                self.__stop.wait(self.__poll_interval)
+
+    def __poll(self):
+        while not self.__stop.wait(self.__poll_interval):
+            try:
+                chash = self.__collection_hash()
+            except PyMongoError:
+                continue
+            # the hash is kept once the listeners succeeded,
+            # else the change is notified again on the next poll
+            if chash != self.__hash and self.bump():
+                self.__hash = chash
@@ -0,0 +1,305 @@
+import bisect
+import threading
+from typing import Dict, Iterable, List, Set, Tuple
+
+from mars.closure import ClosureIndex
+
+# catalog fields indexed with a hash index
+INDEXED_FIELDS = [
+    '_id',
+    'type',
+    'product_reference.designation',
+    'product_reference.id',
+    'product_reference.reference',
+    'product_reference.parent.designation',
+    'product_reference.parent.id',
+    'product_reference.parent.reference',
+    'targeted_area.area',
+    'targeted_area.side',
+    'targeted_area.position'
+]
+
+_MISSING = object()
+
+
+def get_field(document: Dict, path: str) -> object:
+    """ get the value of a dotted path field in a document
+
+    Args:
+        document (Dict): the document
+        path (str): the dotted path (ex: product_reference.parent.id)
+
+    Returns:
+        object: the field value, _MISSING if the field not exists
+    """
+    value = document
+    for key in path.split('.'):
+        if isinstance(value, dict) and key in value:
+            value = value[key]
+        else:
+            return _MISSING
+    return value
+
+
+def match_document(document: Dict, query: Dict) -> bool:
+    """ check if a document match a query,
+        support the equality, $in and $or operators
+        used by the aggregation pipeline
+
+    Args:
+        document (Dict): the document to check
+        query (Dict): the mongodb query
+
+    Raises:
+        ValueError: if the query use an unsupported operator
+
+    Returns:
+        bool: True if the document match the query
+    """
+    for field, condition in query.items():
+        if field == '$or':
+            if not any(match_document(document, sq) for sq in condition):
+                return False
+            continue
+
+        value = get_field(document, field)
+        if value is _MISSING:
+            return False
+        # an array field match if one of its elements match
+        values = value if isinstance(value, list) else [value]
+
+        if isinstance(condition, dict):
+            if list(condition.keys()) != ['$in']:
+                raise ValueError("unsupported query operator in {cond}"
+                                 .format(cond=condition))
+            if not any(v in condition['$in'] for v in values):
+                return False
+        elif condition not in values:
+            return False
+
+    return True
+
+
+class ActionCatalog:
+    """ class used to represent the whole action catalog in memory,
+        with hash indexes on the fields filtered by the sequence requests
+
+        the documents are shared with the callers and must not be modified.
+        the catalog is updated in place by upsert and remove, as the
+        collection changes are received : an updated document keeps its
+        position, an inserted document is added at the end.
+
+    Attributes
+    ----------
+    documents : List[Dict]
+        the catalog documents in the collection natural order
+    closures : ClosureIndex
+        the dependence closures of the catalog actions
+    parsed_actions : Dict[str, Action]
+        identity map of the actions parsed from the catalog documents,
+        shared by all the requests on this catalog
+    """
+
+    def __init__(self, documents: Iterable[Dict]) -> 'ActionCatalog':
+        """ActionCatalog initializer
+
+        Args:
+            documents (Iterable[Dict]): the catalog documents,
+                a collection cursor for example
+        """
+        # None at the positions of the removed documents
+        self.__documents: List[Dict] = list(documents)
+        self.__removed: int = 0
+        self.parsed_actions: Dict = {}
+        # index : field -> field value -> documents positions, ascending
+        self.__indexes: Dict[str, Dict[object, List[int]]] = {
+            field: {} for field in INDEXED_FIELDS
+        }
+        self.__lock = threading.RLock()
+
+        for position, doc in enumerate(self.__documents):
+            self.__index(position, doc)
+
+        self.closures: ClosureIndex = ClosureIndex(self.__documents)
+
+    @property
+    def documents(self) -> List[Dict]:
+        with self.__lock:
+            if self.__removed:
+                return [doc for doc in self.__documents if doc is not None]
+            return self.__documents
+
+    def __len__(self) -> int:
+        return len(self.__documents) - self.__removed
+
+    def upsert(self, document: Dict):
+        """ insert or replace a document, a replaced document keeps
+            its position in the catalog order
+
+        Args:
+            document (Dict): the inserted or updated document
+        """
+        with self.__lock:
+            positions = self.__indexes['_id'].get(document['_id'])
+            if positions:
+                position = positions[0]
+                self.__unindex(position, self.__documents[position])
+                self.__documents[position] = document
+            else:
+                position = len(self.__documents)
+                self.__documents.append(document)
+            self.__index(position, document)
+            self.closures.upsert(document)
+            # the parsed actions may embed the previous document,
+            # the requests in progress keep the previous map
+            self.parsed_actions = {}
+
+    def remove(self, action_id: object):
+        """ remove a document
+
+        Args:
+            action_id (object): the document _id
+        """
+        with self.__lock:
+            positions = self.__indexes['_id'].get(action_id)
+            if not positions:
+                return
+            position = positions[0]
+            self.__unindex(position, self.__documents[position])
+            self.__documents[position] = None
+            self.__removed += 1
+            self.closures.remove(action_id)
+            self.parsed_actions = {}
+
+    def get(self, action_id: object) -> Dict or None:
+        """ get a document from its _id
+
+        Args:
+            action_id (object): the document _id
+
+        Returns:
+            Dict or None: the document, None if not in catalog
+        """
+        with self.__lock:
+            positions = self.__indexes['_id'].get(action_id)
+            return self.__documents[positions[0]] if positions else None
+
+    def find(self, query: Dict) -> List[Dict]:
+        """ get the documents matching a query
+
+        Args:
+            query (Dict): mongodb query with equality, $in and $or operators
+
+        Returns:
+            List[Dict]: the matching documents in catalog order
+        """
+        with self.__lock:
+            positions = self.__select(query)
+            return [self.__documents[p] for p in sorted(positions)]
+
+    def closure(self, documents: Iterable[Dict]) -> List[Dict]:
+        """ get all the documents the given documents depend on,
+            directly or not, as the $graphLookup on dependences.action
+
+        Args:
+            documents (Iterable[Dict]): the start documents
+
+        Returns:
+            List[Dict]: the dependence documents
+        """
+        dep_ids = self.closures.closure(doc['_id'] for doc in documents)
+        return [self.get(dep_id) for dep_id in dep_ids]
+
+    def extract_actions(self, query: Dict,
+                        global_ids: List[str]) -> Tuple[List[Dict],
+                                                        Dict[str, Dict],
+                                                        Dict[str, Dict]]:
+        """ get the actions selected by a query,
+            as the http_server.extract_actions function does for
+            the aggregation pipeline result
+
+        Args:
+            query (Dict): the $match query of the aggregation pipeline
+            global_ids (List[str]): _id of the global actions
+
+        Returns:
+            Tuple: the root actions list, the dependences dictionnary
+                indexed by str(_id) and the global actions dictionnary
+        """
+        root_actions = []
+        global_actions = {}
+
+        # one catalog state for the selection and its dependences
+        with self.__lock:
+            for doc in self.find(query):
+                if doc['_id'] in global_ids:
+                    global_actions[doc['_id']] = doc
+                else:
+                    root_actions.append(doc)
+
+            dependences = {str(dep['_id']): dep
+                           for dep in self.closure(root_actions)}
+
+        return root_actions, dependences, global_actions
+
+    def __select(self, query: Dict) -> Set[int]:
+        candidates: Set[int] or None = None
+        unindexed = {}
+
+        for field, condition in query.items():
+            if field == '$or':
+                selected = set()
+                for sub_query in condition:
+                    selected |= self.__select(sub_query)
+            elif field in self.__indexes:
+                index = self.__indexes[field]
+                if isinstance(condition, dict):
+                    if list(condition.keys()) != ['$in']:
+                        raise ValueError("unsupported query operator in "
+                                         "{cond}".format(cond=condition))
+                    values = condition['$in']
+                else:
+                    values = [condition]
+                selected = set()
+                for value in values:
+                    selected.update(index.get(value, []))
+            else:
+                unindexed[field] = condition
+                continue
+
+            candidates = selected if candidates is None\
+                else candidates & selected
+            if not candidates:
+                return set()
+
+        if candidates is None:
+            candidates = {p for p, doc in enumerate(self.__documents)
+                          if doc is not None}
+
+        # filter on the fields without index
+        if unindexed:
+            candidates = {p for p in candidates
+                          if match_document(self.__documents[p], unindexed)}
+
+        return candidates
+
+    def __index(self, position: int, document: Dict):
+        for field, index in self.__indexes.items():
+            for value in _index_values(document, field):
+                bisect.insort(index.setdefault(value, []), position)
+
+    def __unindex(self, position: int, document: Dict):
+        for field, index in self.__indexes.items():
+            for value in _index_values(document, field):
+                positions = index[value]
+                positions.remove(position)
+                if not positions:
+                    del index[value]
+
+
+def _index_values(document: Dict, field: str) -> List:
+    # values of an indexed field, an array field match each of its elements
+    value = get_field(document, field)
+    if value is _MISSING:
+        return []
+    return value if isinstance(value, list) else [value]
@@ -0,0 +1,190 @@
+import threading
+from typing import Dict, Iterable, List, Tuple
+
+
+class ClosureIndex:
+    """ class used to maintain the transitive dependence closures
+        of the catalog actions, whatever the dependence type
+
+        - the upstream closure of an action is the ordered set of the
+          actions it depends on directly or not, the set resolved by the
+          $graphLookup on dependences.action
+        - the downstream closure of an action is the ordered set of the
+          actions depending on it directly or not
+
+        the upstream closures are computed when the index is built and
+        refreshed incrementally when an action is upserted or removed,
+        the downstream closures are computed on demand.
+    """
+
+    def __init__(self, documents: Iterable[Dict] = ()) -> 'ClosureIndex':
+        """ClosureIndex initializer
+
+        Args:
+            documents (Iterable[Dict]): the catalog documents, only the
+                _id and dependences.action fields are used
+        """
+        # direct dependences of each action in the catalog
+        self.__dependences: Dict[object, Tuple] = {}
+        # direct dependents of each action, the action may not exists
+        # (reference to an action not yet inserted)
+        self.__dependents: Dict[object, Dict[object, None]] = {}
+        self.__upstream: Dict[object, Tuple] = {}
+        self.__downstream: Dict[object, Tuple] = {}
+        self.__lock = threading.RLock()
+
+        for doc in documents:
+            self.__set_dependences(doc['_id'], _dependence_ids(doc))
+
+        for action_id in self.__dependences:
+            self.__upstream[action_id] = self.__compute_upstream(action_id)
+
+    def __len__(self) -> int:
+        return len(self.__dependences)
+
+    def __contains__(self, action_id: object) -> bool:
+        return action_id in self.__dependences
+
+    def upstream(self, action_id: object) -> Tuple:
+        """ get the upstream closure of an action
+
+        Args:
+            action_id (object): the action _id
+
+        Returns:
+            Tuple: _id of the actions the action depends on,
+                empty if the action not in the catalog
+        """
+        return self.__upstream.get(action_id, ())
+
+    def downstream(self, action_id: object) -> Tuple:
+        """ get the downstream closure of an action
+
+        Args:
+            action_id (object): the action _id
+
+        Returns:
+            Tuple: _id of the actions depending on the action
+        """
+        with self.__lock:
+            closure = self.__downstream.get(action_id)
+            if closure is None:
+                closure = self.__compute_downstream(action_id)
+                self.__downstream[action_id] = closure
+            return closure
+
+    def closure(self, action_ids: Iterable[object]) -> List:
+        """ get the union of the upstream closures of several actions
+
+        Args:
+            action_ids (Iterable[object]): the actions _id
+
+        Returns:
+            List: _id of the actions the actions depend on,
+                without duplicate
+        """
+        closure = {}
+        with self.__lock:
+            for action_id in action_ids:
+                for dep_id in self.__upstream.get(action_id, ()):
+                    closure[dep_id] = None
+        return list(closure)
+
+    def upsert(self, document: Dict):
+        """ insert or update an action and refresh the closures
+            of the actions depending on it
+
+        Args:
+            document (Dict): the action document
+        """
+        action_id = document['_id']
+        with self.__lock:
+            # actions depending on the action, its closure in theirs
+            affected = (action_id,) + self.downstream(action_id)
+
+            self.__set_dependences(action_id, _dependence_ids(document))
+            self.__refresh(affected)
+
+    def remove(self, action_id: object):
+        """ remove an action and refresh the closures
+            of the actions depending on it
+
+        Args:
+            action_id (object): the action _id
+        """
+        with self.__lock:
+            if action_id not in self.__dependences:
+                return
+
+            affected = self.downstream(action_id)
+
+            self.__set_dependences(action_id, ())
+            del self.__dependences[action_id]
+            del self.__upstream[action_id]
+            self.__refresh(affected)
+
+    def __set_dependences(self, action_id: object, dependences: Tuple):
+        for dep_id in self.__dependences.get(action_id, ()):
+            self.__dependents[dep_id].pop(action_id, None)
+        for dep_id in dependences:
+            self.__dependents.setdefault(dep_id, {})[action_id] = None
+        self.__dependences[action_id] = dependences
+
+    def __refresh(self, affected: Tuple):
+        # drop the outdated closures before computing the new ones
+        # so only the valid closures are reused
+        for action_id in affected:
+            self.__upstream.pop(action_id, None)
+        for action_id in affected:
+            if action_id in self.__dependences:
+                self.__upstream[action_id] = \
+                    self.__compute_upstream(action_id)
+        self.__downstream.clear()
+
+    def __compute_upstream(self, action_id: object) -> Tuple:
+        closure = []
+        seen = {action_id}
+        stack = list(reversed(self.__dependences[action_id]))
+
+        while stack:
+            dep_id = stack.pop()
+            if dep_id in seen:
+                continue
+            seen.add(dep_id)
+
+            # reference to an action not in the catalog, ignored
+            # as by the $graphLookup
+            if dep_id not in self.__dependences:
+                continue
+            closure.append(dep_id)
+
+            # reuse the closure of the dependence if already computed
+            dep_closure = self.__upstream.get(dep_id)
+            if dep_closure is not None:
+                for cid in dep_closure:
+                    if cid not in seen:
+                        seen.add(cid)
+                        closure.append(cid)
+            else:
+                stack.extend(reversed(self.__dependences[dep_id]))
+
+        return tuple(closure)
+
+    def __compute_downstream(self, action_id: object) -> Tuple:
+        closure = []
+        seen = {action_id}
+        stack = list(reversed(list(self.__dependents.get(action_id, ()))))
+
+        while stack:
+            dep_id = stack.pop()
+            if dep_id in seen:
+                continue
+            seen.add(dep_id)
+            closure.append(dep_id)
+            stack.extend(reversed(list(self.__dependents.get(dep_id, ()))))
+
+        return tuple(closure)
+
+
+def _dependence_ids(document: Dict) -> Tuple:
+    return tuple(dep['action'] for dep in document.get('dependences', []))
@@ -0,0 +1,183 @@
+from typing import Dict, Iterable, List
+
+import numpy as np
+
+from mars.action import Action
+from mars.movement import Movement, Path, PositionType, PATHS, POSITION_TYPES
+from mars.tool import ToolManipulation
+import mars.proxyapi as proxyapi
+
+# codes of the movement points columns
+_JOINT_PATH = PATHS.index(Path.JOINT)
+_CARTESIAN = POSITION_TYPES.index(PositionType.CARTESIAN)
+
+
+class CycleTimeModel:
+    """ class used to describe the cell timings used to estimate
+        the execution time of a sequence
+
+    Attributes
+    ----------
+    joint_speed : float
+        maximum speed of the arm joints (deg/s), reached at 100%
+        speed on a joint path
+    e1_speed : float
+        maximum speed of the 7th axis (mm/s)
+    linear_joint_ratio : float
+        tcp distance for one degree of the most moving joint (mm/deg),
+        used to convert the joint and tcp distances
+    fine_stop_time : float
+        time to settle on a point with a cnt of 0 (s), decreasing
+        linearly to 0 for a cnt of 100
+    unknown_move_time : float
+        time of a move between a joint and a cartesian position (s),
+        the distance being unknown without the arm kinematics
+    tool_change_time : float
+        time of a tool change asked to the operator on the HMI (s)
+    program_times : Dict[str, float]
+        time to launch a robot program and wait for its end (s),
+        per program code name, TRAJ_GEN time excluding the movement
+    action_times : Dict[str, float]
+        additional time per action type (s)
+    """
+
+    def __init__(self, joint_speed: float = 180.0,
+                 e1_speed: float = 1000.0,
+                 linear_joint_ratio: float = 15.0,
+                 fine_stop_time: float = 0.1,
+                 unknown_move_time: float = 1.0,
+                 tool_change_time: float = 30.0,
+                 program_times: Dict[str, float] = None,
+                 action_times: Dict[str, float] = None) -> 'CycleTimeModel':
+        """CycleTimeModel initializer
+
+        Args:
+            joint_speed (float, optional): arm joints maximum speed (deg/s).
+                Defaults to 180.0.
+            e1_speed (float, optional): 7th axis maximum speed (mm/s).
+                Defaults to 1000.0.
+            linear_joint_ratio (float, optional): tcp distance per joint
+                degree (mm/deg). Defaults to 15.0.
+            fine_stop_time (float, optional): settle time for a cnt of 0 (s).
+                Defaults to 0.1.
+            unknown_move_time (float, optional): time of a move between
+                a joint and a cartesian position (s). Defaults to 1.0.
+            tool_change_time (float, optional): HMI tool change time (s).
+                Defaults to 30.0.
+            program_times (Dict[str, float], optional): program launch
+                time per program code name (s). Defaults to 0.5 s for each.
+            action_times (Dict[str, float], optional): additional time per
+                action type (s). Defaults to None.
+        """
+        self.joint_speed: float = joint_speed
+        self.e1_speed: float = e1_speed
+        self.linear_joint_ratio: float = linear_joint_ratio
+        self.fine_stop_time: float = fine_stop_time
+        self.unknown_move_time: float = unknown_move_time
+        self.tool_change_time: float = tool_change_time
+        self.program_times: Dict[str, float] = \
+            {code.name: 0.5 for code in proxyapi.ProgramCode}
+        self.program_times.update(program_times or {})
+        self.action_times: Dict[str, float] = dict(action_times or {})
+
+
+def estimate_cycle_time(actions: Iterable[Action],
+                        model: CycleTimeModel = None) -> Dict:
+    """ estimate the execution time of a sequence of actions
+
+        the points of all the movements are gathered in arrays and the
+        time of each move from the previous point of the sequence is
+        computed at once : the arm and the 7th axis move together, the
+        arm time is given by the largest joint delta for a joint path,
+        or by the tcp distance at the point speed (mm/s) for a linear
+        path. the settle time of the point depends on its cnt.
+
+        each movement launches the trajectory program and each tool
+        manipulation asks a tool change on the HMI then launches the
+        user tool and frame change program.
+
+    Args:
+        actions (Iterable[Action]): the actions, in sequence order
+        model (CycleTimeModel, optional): the cell timings.
+            Defaults to the CycleTimeModel defaults.
+
+    Returns:
+        Dict: the total time and the time of each action (s) :
+            {"total": float, "actions": [{"id", "type", "time"}]}
+    """
+    if model is None:
+        model = CycleTimeModel()
+
+    actions = list(actions)
+    fixed: List[float] = []
+    owners: List[np.ndarray] = []
+    points: List[np.ndarray] = []
+
+    trajectory_time = model.program_times[proxyapi.ProgramCode.TRAJ_GEN.name]
+    utuf_time = model.program_times[proxyapi.ProgramCode.CHANGE_UTUF.name]
+    for index, action in enumerate(actions):
+        definition = action.definition
+        action_time = model.action_times.get(action.type, 0)
+        if isinstance(definition, Movement):
+            action_time += trajectory_time
+            # the movement points columns
+            points.append(definition.point_array)
+            owners.append(np.full(len(definition.point_array), index))
+        elif isinstance(definition, ToolManipulation):
+            action_time += model.tool_change_time + utuf_time
+        fixed.append(action_time)
+
+    times = np.array(fixed, dtype=float)
+    if points:
+        columns = np.concatenate(points)
+        points_time = _points_time(
+            model, columns['vector'], columns['e1'], columns['speed'],
+            columns['cnt'], columns['path'] != _JOINT_PATH,
+            columns['type'] == _CARTESIAN)
+        times += np.bincount(np.concatenate(owners), weights=points_time,
+                             minlength=len(actions))
+
+    return {
+        "total": round(float(times.sum()), 3),
+        "actions": [{"id": action.id,
+                     "type": action.type,
+                     "time": round(float(action_time), 3)}
+                    for action, action_time in zip(actions, times)]
+    }
+
+
+def _points_time(model: CycleTimeModel,
+                 vectors: np.ndarray,
+                 e1s: np.ndarray,
+                 speeds: np.ndarray,
+                 cnts: np.ndarray,
+                 linears: np.ndarray,
+                 cartesians: np.ndarray) -> np.ndarray:
+    # time to reach each point from the previous point of the sequence,
+    # the first point is the starting position
+    delta = np.abs(np.diff(vectors, axis=0))
+    same_type = cartesians[1:] == cartesians[:-1]
+    crt = cartesians[1:]
+
+    # tcp distance (mm) and largest joint delta (deg) of each move
+    tcp_distance = np.where(crt,
+                            np.linalg.norm(delta[:, :3], axis=1),
+                            delta.max(axis=1) * model.linear_joint_ratio)
+    joint_delta = tcp_distance / model.linear_joint_ratio
+
+    # a null speed would give an infinite time
+    speed = np.maximum(speeds[1:], 1)
+    linear = linears[1:]
+    arm_time = np.where(linear,
+                        tcp_distance / speed,
+                        joint_delta / (model.joint_speed * speed / 100))
+    arm_time = np.where(same_type, arm_time, model.unknown_move_time)
+
+    # the 7th axis follows the joint path speed override
+    e1_speed = np.where(linear, model.e1_speed,
+                        model.e1_speed * speed / 100)
+    e1_time = np.abs(np.diff(e1s)) / e1_speed
+
+    settle_time = model.fine_stop_time * np.clip(1 - cnts / 100, 0, 1)
+    move_time = np.concatenate(([0.0], np.maximum(arm_time, e1_time)))
+    return move_time + settle_time
@@ -0,0 +1,77 @@
+from typing import Dict, Iterator, List
+
+# types of the actions done by the operator on the HMI
+USER_ACTION_TYPES = ['LOAD.EFFECTOR', 'LOAD.TOOL',
+                     'UNLOAD.EFFECTOR', 'UNLOAD.TOOL']
+
+
+def get_action_target(action_type: str) -> str:
+    """ get who executes an action
+
+    Args:
+        action_type (str): the action type value
+
+    Returns:
+        str: "USER" for the tool manipulations, "ROBOT" otherwise
+    """
+    if action_type in USER_ACTION_TYPES:
+        return "USER"
+    else:
+        return "ROBOT"
+
+
+def describe_sequence(sequence: List[Dict]) -> List[Dict]:
+    """ get the process tree description of a sequence :
+        the consecutive actions with the same target grouped
+        in steps, without the first and last actions (home)
+
+    Args:
+        sequence (List[Dict]): the action sequences or stages,
+            with their id, type and description
+
+    Returns:
+        List[Dict]: the steps {"target", "stepStages"}
+    """
+    # suppression du la premier et dernier element (home)
+    seq = sequence[1:-1]
+    return list(action_group_generator(seq))
+
+
+def action_group_generator(sequence: List[Dict]) -> Iterator[Dict]:
+    li = 0  # var to store index
+    # var to store action sequence
+    # generate list from sequence adding target information
+    seq_list = [{"target": get_action_target(a['type']), "action": a}
+                for a in sequence]
+    # var to store group, init with target index 0
+    group = seq_list[0]['target']
+
+    # while index < sequence end
+    while li < len(seq_list):
+        step_stages = []  # var to store stages
+
+        # while action target is same add action in step_stages
+        while seq_list[li]['target'] == group:
+            a = seq_list[li]['action']
+            # append object describing action on step_stages
+            step_stages.append(
+                {
+                 "description": a['description'],
+                 "id": a['id'],
+                 "type": a['type']
+                }
+            )
+            li += 1  # increment index
+
+            # if end on sequence break the loop
+            if li >= len(seq_list):
+                break
+
+        # when quit the loop (target change or end of sequence)
+        # yield object with group and step_changes
+        yield {"target": group,
+               "stepStages": step_stages}
+
+        # update group if not the end of sequence
+        if li < len(seq_list):
+            group = seq_list[li]['target']
@@ -0,0 +1,61 @@
+from typing import Callable, Dict, List
+
+# the binary encodings are optional, a response is only encoded
+# with the encodings whose package is installed
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import cbor2
+except ImportError:
+    cbor2 = None
+
+JSON_MIMETYPE = 'application/json'
+MSGPACK_MIMETYPE = 'application/msgpack'
+CBOR_MIMETYPE = 'application/cbor'
+
+
+def __binary_encoders() -> Dict[str, Callable[[object], bytes]]:
+    encoders = {}
+    if msgpack is not None:
+        # packb and not a shared Packer, the responses are encoded
+        # by several threads
+        encoders[MSGPACK_MIMETYPE] = msgpack.packb
+    if cbor2 is not None:
+        encoders[CBOR_MIMETYPE] = cbor2.dumps
+    return encoders
+
+
+# encoder of each available binary encoding, by mimetype
+BINARY_ENCODERS: Dict[str, Callable[[object], bytes]] = __binary_encoders()
+
+
+def binary_mimetypes() -> List[str]:
+    """ get the mimetypes of the available binary encodings
+
+    Returns:
+        List[str]: the mimetypes, in preference order
+    """
+    return list(BINARY_ENCODERS)
+
+
+def encode_binary(result: Dict, mimetype: str) -> bytes:
+    """ encode a response body with a binary encoding
+
+    Args:
+        result (Dict): the response body
+        mimetype (str): the binary encoding mimetype
+
+    Raises:
+        ValueError: if the encoding is unknown or its package not installed
+
+    Returns:
+        bytes: the encoded response body
+    """
+    encoder = BINARY_ENCODERS.get(mimetype)
+    if encoder is None:
+        raise ValueError('binary encoding {mimetype} not available'
+                         .format(mimetype=mimetype))
+    return encoder(result)
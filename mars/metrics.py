@@ -0,0 +1,183 @@
+import bisect
+import functools
+import threading
+import time
+from typing import Dict, List, Tuple
+
+# default histogram buckets in seconds
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+                   0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class _NoTimer:
+    # timer used when the metrics are disabled, does nothing
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+_NO_TIMER = _NoTimer()
+
+
+class _StageTimer:
+    # measure the duration of a stage and record it on exit
+
+    __slots__ = ('__metrics', '__stage', '__start')
+
+    def __init__(self, metrics: 'Metrics', stage: str):
+        self.__metrics = metrics
+        self.__stage = stage
+
+    def __enter__(self):
+        self.__start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.__metrics.observe(self.__stage,
+                               time.perf_counter() - self.__start)
+        return False
+
+
+class Metrics:
+    """ class used to collect the request processing metrics :
+        a duration histogram per processing stage and counters,
+        exposed in the prometheus text format
+
+        when disabled the timers and counters do nothing
+
+    Attributes
+    ----------
+    enabled : bool
+        True if the metrics are collected
+    """
+
+    def __init__(self, enabled: bool = True,
+                 prefix: str = 'mars',
+                 buckets: Tuple[float] = DEFAULT_BUCKETS) -> 'Metrics':
+        """Metrics initializer
+
+        Args:
+            enabled (bool, optional): collect the metrics. Defaults to True.
+            prefix (str, optional): prefix of the metrics names.
+                Defaults to 'mars'.
+            buckets (Tuple[float], optional): histogram buckets upper bounds
+                in seconds. Defaults to DEFAULT_BUCKETS.
+        """
+        self.enabled: bool = enabled
+        self.__prefix: str = prefix
+        self.__buckets: Tuple[float] = tuple(sorted(buckets))
+        # stage -> [bucket counts..., +Inf count], sum
+        self.__histograms: Dict[str, Tuple[List[int], List[float]]] = {}
+        self.__counters: Dict[str, float] = {}
+        self.__lock = threading.Lock()
+
+    def timer(self, stage: str):
+        """ get a context manager measuring the duration of a stage
+
+        Args:
+            stage (str): the stage name
+
+        Returns:
+            the context manager
+        """
+        if not self.enabled:
+            return _NO_TIMER
+        return _StageTimer(self, stage)
+
+    def timed(self, stage: str):
+        """ get a decorator measuring the duration of a function calls
+
+        Args:
+            stage (str): the stage name
+
+        Returns:
+            the decorator
+        """
+        def decorator(function):
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return function(*args, **kwargs)
+                with _StageTimer(self, stage):
+                    return function(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def observe(self, stage: str, duration: float):
+        """ record a stage duration
+
+        Args:
+            stage (str): the stage name
+            duration (float): the duration in seconds
+        """
+        if not self.enabled:
+            return
+        index = bisect.bisect_left(self.__buckets, duration)
+        with self.__lock:
+            histogram = self.__histograms.get(stage)
+            if histogram is None:
+                histogram = ([0] * (len(self.__buckets) + 1), [0.0])
+                self.__histograms[stage] = histogram
+            histogram[0][index] += 1
+            histogram[1][0] += duration
+
+    def inc(self, counter: str, value: float = 1):
+        """ increment a counter
+
+        Args:
+            counter (str): the counter name
+            value (float, optional): the increment. Defaults to 1.
+        """
+        if not self.enabled:
+            return
+        with self.__lock:
+            self.__counters[counter] = self.__counters.get(counter, 0) + value
+
+    def render(self) -> str:
+        """ get the metrics in the prometheus text exposition format
+
+        Returns:
+            str: the metrics
+        """
+        name = self.__prefix + '_stage_duration_seconds'
+        lines = [
+            '# HELP {name} Request processing duration per stage.'
+            .format(name=name),
+            '# TYPE {name} histogram'.format(name=name)
+        ]
+
+        with self.__lock:
+            histograms = {stage: (list(counts), total[0])
+                          for stage, (counts, total)
+                          in self.__histograms.items()}
+            counters = dict(self.__counters)
+
+        for stage, (counts, total) in sorted(histograms.items()):
+            cumulative = 0
+            bounds = [_format_value(b) for b in self.__buckets] + ['+Inf']
+            for bound, count in zip(bounds, counts):
+                cumulative += count
+                lines.append('{name}_bucket{{stage="{stage}",le="{le}"}} '
+                             '{value}'.format(name=name, stage=stage,
+                                              le=bound, value=cumulative))
+            lines.append('{name}_sum{{stage="{stage}"}} {value}'
+                         .format(name=name, stage=stage,
+                                 value=_format_value(total)))
+            lines.append('{name}_count{{stage="{stage}"}} {value}'
+                         .format(name=name, stage=stage, value=cumulative))
+
+        for counter, value in sorted(counters.items()):
+            cname = '{prefix}_{counter}_total'.format(prefix=self.__prefix,
+                                                      counter=counter)
+            lines.append('# TYPE {name} counter'.format(name=cname))
+            lines.append('{name} {value}'.format(name=cname,
+                                                 value=_format_value(value)))
+
+        return '\n'.join(lines) + '\n'
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value))
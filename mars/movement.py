@@ -297,6 +297,18 @@ class Point:
     def position(self):
         return self.__position
 
+    @property
+    def cnt(self) -> int:
+        return self.__cnt
+
+    @property
+    def speed(self) -> int:
+        return self.__speed
+
+    @property
+    def path(self) -> Path:
+        return self.__path
+
     @staticmethod
     def parse(serialize_point: Dict) -> 'Point':
         cnt = serialize_point['cnt']
@@ -324,38 +336,164 @@ class Point:
         }
 
 
+# codes of the columnar points representation, index in these lists
+PATHS: List[Path] = list(Path)
+POSITION_TYPES: List[PositionType] = list(PositionType)
+CONFIGS: List[List[Enum]] = [list(WristConfig),
+                             list(ForeArmConfig),
+                             list(ArmConfig)]
+
+# position vector keys per position type code
+VECTOR_KEYS: List[List[str]] = [
+    ['j1', 'j2', 'j3', 'j4', 'j5', 'j6'] if ptype == PositionType.JOINT
+    else ['x', 'y', 'z', 'w', 'p', 'r']
+    for ptype in POSITION_TYPES]
+
+# structured array record describing a movement point
+POINT_DTYPE = np.dtype([
+    ('vector', np.float64, (6,)),
+    ('e1', np.float64),
+    ('speed', np.float64),
+    ('cnt', np.float64),
+    ('path', np.uint8),
+    ('type', np.uint8),
+    # wrist, forearm and arm configuration codes (cartesian positions)
+    ('config', np.uint8, (3,)),
+    # bits set when e1, speed or cnt were given as integers
+    ('ints', np.uint8)
+])
+
+INT_E1 = 1
+INT_SPEED = 2
+INT_CNT = 4
+
+_PATH_CODES = {path.name: code for code, path in enumerate(PATHS)}
+_POSITION_TYPE_CODES = {ptype.name: code
+                        for code, ptype in enumerate(POSITION_TYPES)}
+_CONFIG_CODES = [{config.name: code for code, config in enumerate(configs)}
+                 for configs in CONFIGS]
+_CARTESIAN = POSITION_TYPES.index(PositionType.CARTESIAN)
+_NO_CONFIG = (0, 0, 0)
+
+# proxy path code of each path code
+_PATH_SETTINGS = [proxyapi.PathCode[path.name].value for path in PATHS]
+
+
 class Movement(Definition):
 
     """ Class used to represent a Movement
+
+        the points are kept in columns, one POINT_DTYPE record per point,
+        the Point objects are only built when asked by the points property
     """
-    def __init__(self, uf: int, ut: int, points: List[Point]):
+    def __init__(self, uf: int, ut: int,
+                 points: np.ndarray or List[Point]):
         """Movement object initializer
 
         Args:
             uf (int): user frame id
             ut (int): user tool id
-            points (List[Point]): list of points describing the movement
+            points (np.ndarray or List[Point]): POINT_DTYPE records
+                describing the movement points, or the Point objects,
+                converted to records
         """
+        if not isinstance(points, np.ndarray):
+            points = np.array([Movement.__parse_point(point.to_dict())
+                               for point in points], dtype=POINT_DTYPE)
         self._uf: int = uf
         self._ut: int = ut
-        self._points: List[Point] = points
+        self._points: np.ndarray = points
+
+    @property
+    def points(self) -> List[Point]:
+        points = []
+        for record, e1, speed, cnt in zip(self._points, self.e1s,
+                                          self.__exact('speed', INT_SPEED),
+                                          self.__exact('cnt', INT_CNT)):
+            vector = record['vector'].copy()
+            if record['type'] == _CARTESIAN:
+                wrist, forearm, arm = record['config'].tolist()
+                config = Configuration(CONFIGS[0][wrist],
+                                       CONFIGS[1][forearm],
+                                       CONFIGS[2][arm])
+                position = PositionCrt(vector, e1, config)
+            else:
+                position = PositionJoint(vector, e1)
+            points.append(Point(cnt, speed, PATHS[record['path']], position))
+        return points
+
+    @property
+    def point_array(self) -> np.ndarray:
+        """ POINT_DTYPE records of the movement points """
+        return self._points
+
+    @property
+    def e1s(self) -> List[float]:
+        """ 7th axis positions of the movement points, as given """
+        return self.__exact('e1', INT_E1)
 
     @staticmethod
     def parse(serialize_movement: Dict) -> 'Movement':
         ut = serialize_movement['ut']
         uf = serialize_movement['uf']
-        points = []
+        records = [Movement.__parse_point(sp)
+                   for sp in serialize_movement['points']]
+
+        return Movement(uf, ut, np.array(records, dtype=POINT_DTYPE))
 
-        for sp in serialize_movement['points']:
-            points.append(Point.parse(sp))
+    @staticmethod
+    def __parse_point(serialize_point: Dict) -> tuple:
+        cnt = serialize_point['cnt']
+        path = _PATH_CODES[serialize_point['path']]
+        speed = serialize_point['speed']
 
-        return Movement(uf, ut, points)
+        serialize_position = serialize_point['position']
+        ptype = _POSITION_TYPE_CODES.get(serialize_position['type'])
+        if ptype is None:
+            raise Exception('position parsing default')
+        e1 = serialize_position['e1']
+        config = _NO_CONFIG
+        if ptype == _CARTESIAN:
+            sconfig = serialize_position['config']
+            config = tuple(codes[sconfig[key]] for codes, key
+                           in zip(_CONFIG_CODES, ['wrist', 'forearm', 'arm']))
+        svector = serialize_position['vector']
+        vector = [svector[key] for key in VECTOR_KEYS[ptype]]
+
+        ints = 0
+        if isinstance(e1, int):
+            ints |= INT_E1
+        if isinstance(speed, int):
+            ints |= INT_SPEED
+        if isinstance(cnt, int):
+            ints |= INT_CNT
+
+        return (vector, e1, speed, cnt, path, ptype, config, ints)
 
     def to_dict(self):
+        points = []
+        for vector, e1, speed, cnt, path, ptype, config\
+                in self.__point_values():
+            position_type = POSITION_TYPES[ptype]
+            points.append({
+                "cnt": cnt,
+                "speed": speed,
+                "position": {
+                    "ut": 0,
+                    "uf": 0,
+                    "type": position_type.name,
+                    "e1": e1,
+                    "vector": dict(zip(VECTOR_KEYS[ptype], vector)),
+                    "config": _config_to_dict(config)
+                    if ptype == _CARTESIAN else None
+                },
+                "path": PATHS[path].name
+            })
+
         return {
             "uf": self._uf,
             "ut": self._ut,
-            "points": [p.to_dict() for p in self._points]
+            "points": points
         }
 
     def get_sequence(self):
@@ -363,10 +501,18 @@ class Movement(Definition):
         points_settings = [len(self._points)]
         points_parameters = []
 
-        for p in self._points:
-            p_para = p.get_sequence()
-            points_parameters.append(p_para['position'])
-            points_settings.extend(p_para['settings'])
+        for vector, e1, speed, cnt, path, ptype, config\
+                in self.__point_values():
+            points_parameters.append({
+                "ut": 0,
+                "uf": 0,
+                "type": POSITION_TYPES[ptype].value,
+                "e1": e1,
+                "vector": dict(zip(VECTOR_KEYS[ptype], vector)),
+                "config": _config_to_dict(config)
+                if ptype == _CARTESIAN else None
+            })
+            points_settings.extend((_PATH_SETTINGS[path], speed, cnt))
 
         # if only one point -> position_set_request else positions_set_request
         if len(points_parameters) > 1:
@@ -410,3 +556,35 @@ class Movement(Definition):
                         .launch_program_request(proxyapi.ProgramCode.TRAJ_GEN))
 
         return sequence
+
+    def __point_values(self):
+        # python values of the points columns, the vectors rounded
+        # at once, as (vector, e1, speed, cnt, path, type, config)
+        points = self._points
+        for vector, (_, e1, speed, cnt, path, ptype, config, ints)\
+                in zip(np.round(points['vector'], 3).tolist(),
+                       points.tolist()):
+            if ints:
+                e1 = int(e1) if ints & INT_E1 else e1
+                speed = int(speed) if ints & INT_SPEED else speed
+                cnt = int(cnt) if ints & INT_CNT else cnt
+            yield vector, e1, speed, cnt, path, ptype, config
+
+    def __exact(self, column: str, int_bit: int) -> list:
+        # the column values with the type they were given
+        values = self._points[column].tolist()
+        for index in np.flatnonzero(self._points['ints'] & int_bit):
+            values[index] = int(values[index])
+        return values
+
+
+def _config_to_dict(config: List[int]) -> Dict:
+    wrist, forearm, arm = config
+    return {
+        "wrist": CONFIGS[0][wrist].name,
+        "forearm": CONFIGS[1][forearm].name,
+        "arm": CONFIGS[2][arm].name,
+        "j4": 0,
+        "j5": 0,
+        "j6": 0
+    }
@@ -0,0 +1,188 @@
+from collections import Counter
+import threading
+from typing import Dict, List, Tuple
+
+from mars.action import Action
+from mars.actiontreelib import ActionTree, ActionNode
+from mars.scheduler import DependenceScheduler
+
+
+class BranchTree:
+    """ class used to keep the process tree of a family of requests,
+        without the planning and the global actions, and to patch it
+        when the root actions of a request differ from the last one
+
+        the tree is built branch by branch like ActionTree.add_branches
+        does. each node remembers the root action of the branch which
+        added it and its rank in this branch : the children of a node
+        and the effector nodes are in the order of these ranks, the
+        branches being in the request order.
+
+        a branch is removed in place if no other branch goes through the
+        nodes it added, a branch is added in place if the nodes of its
+        closure already in the tree were added by the previous branches.
+        in the other cases the tree is rebuilt, so a patched tree is
+        always the tree a full build would give.
+
+    Attributes
+    ----------
+    identity_map : Dict[str, Action]
+        the actions parsed for the requests of the family
+    patches : int
+        number of updates done by patching the tree
+    rebuilds : int
+        number of updates done by rebuilding the tree
+    """
+
+    def __init__(self, identity_map: Dict[str, Action] = None) -> 'BranchTree':
+        """BranchTree initializer
+
+        Args:
+            identity_map (Dict[str, Action], optional): the map used to
+                parse the actions of the family. Defaults to a new map.
+        """
+        self.identity_map: Dict[str, Action] =\
+            {} if identity_map is None else identity_map
+        self.patches: int = 0
+        self.rebuilds: int = 0
+        self.__lock = threading.Lock()
+        self.__tree: ActionTree = None
+        # root actions ids in the request order, None if not patchable
+        self.__roots: List[str] = None
+        # root action id -> ids of the actions in its closure
+        self.__closures: Dict[str, List[str]] = {}
+        # root action id -> ids of the nodes added by its branch, in order
+        self.__added: Dict[str, List[str]] = {}
+        # node id -> root action id of the branch which added it and rank
+        self.__owners: Dict[str, Tuple[str, int]] = {}
+        # node id -> number of closures going through the node
+        self.__visits: Counter = Counter()
+
+    def update(self, actions: List[Action]) -> Tuple[ActionTree, bool]:
+        """ bring the tree to the branches of a list of root actions
+
+        Args:
+            actions (List[Action]): the root actions, in the request order
+
+        Raises:
+            DependenceCycleError: if the dependences contain a cycle
+
+        Returns:
+            Tuple[ActionTree, bool]: a copy of the tree, to plan and insert
+                the global actions in, and True if the tree was patched
+        """
+        with self.__lock:
+            patched = self.__tree is not None and self.__patch(actions)
+            if patched:
+                self.patches += 1
+            else:
+                self.__build(actions)
+                self.rebuilds += 1
+            return self.__tree.copy(), patched
+
+    def __build(self, actions: List[Action]):
+        self.__tree = None
+        self.__closures.clear()
+        self.__added.clear()
+        self.__owners.clear()
+        self.__visits.clear()
+
+        tree = ActionTree()
+        roots = [action.id for action in actions]
+        if len(set(roots)) != len(roots):
+            # a root action repeated, its branches can't be told apart
+            tree.add_branches(actions)
+            self.__roots = None
+        else:
+            scheduler = DependenceScheduler()
+            for action in actions:
+                self.__add_branch(tree, action.id, scheduler.schedule(action))
+            self.__roots = roots
+        self.__tree = tree
+
+    def __add_branch(self, tree: ActionTree, root: str,
+                     closure: List[Action]) -> List[ActionNode]:
+        self.__closures[root] = [action.id for action in closure]
+        self.__visits.update(self.__closures[root])
+        added = tree.add_action_nodes(closure)
+        self.__added[root] = [node.identifier for node in added]
+        for rank, node in enumerate(added):
+            self.__owners[node.identifier] = (root, rank)
+        return added
+
+    def __patch(self, actions: List[Action]) -> bool:
+        # patch the tree in place, False if it would differ from a build
+        roots = [action.id for action in actions]
+        if self.__roots is None or len(set(roots)) != len(roots):
+            return False
+
+        old = set(self.__roots)
+        new = set(roots)
+        # the kept branches must stay in the same order
+        if [r for r in self.__roots if r in new] != \
+                [r for r in roots if r in old]:
+            return False
+
+        removed = [r for r in self.__roots if r not in new]
+        if not removed and len(old) == len(new):
+            return True
+        position = {root: index for index, root in enumerate(roots)}
+        tree = self.__tree
+
+        # the nodes of the removed branches must be in no kept closure
+        # and have no child added by a kept branch
+        removed_nodes = [nid for r in removed for nid in self.__added[r]]
+        removed_set = set(removed_nodes)
+        removed_visits = Counter(nid for r in removed
+                                 for nid in self.__closures[r])
+        for nid in removed_nodes:
+            if self.__visits[nid] > removed_visits[nid]:
+                return False
+            if any(child.identifier not in removed_set
+                   for child in tree[nid].iter_children()):
+                return False
+
+        # the nodes of the added closures already in the tree
+        # must come from the previous branches
+        scheduler = DependenceScheduler()
+        additions = []
+        for index, action in enumerate(actions):
+            if action.id in old:
+                continue
+            closure = scheduler.schedule(action)
+            for dependence in closure:
+                owner = self.__owners.get(dependence.id)
+                if owner is not None and dependence.id not in removed_set\
+                        and position[owner[0]] > index:
+                    return False
+            additions.append((index, action.id, closure))
+
+        # remove the branches, the children before their parents
+        for nid in reversed(removed_nodes):
+            tree.remove_node(nid)
+            del self.__owners[nid]
+        for r in removed:
+            for nid in self.__closures.pop(r):
+                self.__visits[nid] -= 1
+                if not self.__visits[nid]:
+                    del self.__visits[nid]
+            del self.__added[r]
+        self.__roots = roots
+
+        # add the branches, each added node before the nodes
+        # of the next branches
+        for index, root, closure in additions:
+            for node in self.__add_branch(tree, root, closure):
+                parent = tree.parent(node.identifier)
+                before = next((sibling for sibling
+                               in tree.children(parent.identifier)
+                               if position[self.__owners[
+                                   sibling.identifier][0]] > index), None)
+                if before is not None:
+                    tree.move_node(node.identifier, parent.identifier,
+                                   before.identifier)
+
+        tree.sort_tool_nodes(
+            lambda node: (position[self.__owners[node.identifier][0]],
+                          self.__owners[node.identifier][1]))
+        return True
@@ -0,0 +1,272 @@
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from mars.action import Action
+from mars.actiontreelib import ActionTree, ActionNode, node_sort_key
+from mars.movement import Movement
+
+# type of the station movements ordered by the station moves minimization
+STATION_MOVE_TYPE = 'MOVE.STATION.WORK'
+
+
+def plan_process_tree(process_tree: ActionTree, options: Dict) -> Dict:
+    """ apply the planning passes asked in the request options
+        on a process tree, before the global actions insertion
+
+    Args:
+        process_tree (ActionTree): the process tree
+        options (Dict): the request planning options
+
+    Returns:
+        Dict: the planning report, also stored in process_tree.planning
+    """
+    if options.get('minimizeToolChanges'):
+        process_tree.planning['toolChangesSaved'] = \
+            minimize_tool_changes(process_tree)
+
+    if options.get('minimizeStationMoves'):
+        before, after = minimize_station_moves(process_tree)
+        process_tree.planning['e1Travel'] = {'before': round(before, 3),
+                                             'after': round(after, 3)}
+
+    # applied when the sequence is generated, the count reported then
+    if options.get('eliminateRedundantWrites'):
+        process_tree.eliminate_redundant_writes = True
+
+    if options.get('persistentTracker'):
+        process_tree.persistent_tracker = True
+
+    return process_tree.planning
+
+
+def effector_key(node: ActionNode) -> Tuple[str, str]:
+    """ get the identity of the effector loaded or unloaded by a node
+
+    Args:
+        node (ActionNode): an effector load or unload node
+
+    Returns:
+        Tuple[str, str]: the tool type and reference
+    """
+    definition = node.data.definition
+    return definition.tool_type, definition.tool_reference
+
+
+def minimize_tool_changes(process_tree: ActionTree) -> int:
+    """ group the work done with the same effector under one load
+        and one unload of this effector
+
+        the effector loads and unloads are children of the root node, in
+        the order the branches were added. the first load of an effector
+        keeps its place and receives the children of the next loads of
+        the same effector, its unload follows it. the next loads and
+        unloads of the effector are removed. the children of a load
+        being sorted on their work order, the work order and dependences
+        of the actions below the load are respected.
+
+    Args:
+        process_tree (ActionTree): the process tree,
+            without the global actions
+
+    Returns:
+        int: number of tool changes (unload then load) saved
+    """
+    root = process_tree.get_node(process_tree.root)
+    loads: Dict[Tuple[str, str], ActionNode] = {}
+    unloads: Dict[Tuple[str, str], ActionNode] = {}
+    order: List[ActionNode] = []
+    removed: List[ActionNode] = []
+
+    for node in root.iter_children():
+        if node.action_type == 'LOAD.EFFECTOR':
+            kept = loads.setdefault(effector_key(node), node)
+            if kept is node:
+                order.append(node)
+            else:
+                removed.append(node)
+        elif node.action_type == 'UNLOAD.EFFECTOR':
+            key = effector_key(node)
+            if key in unloads:
+                removed.append(node)
+            else:
+                unloads[key] = node
+        else:
+            order.append(node)
+
+    if not removed:
+        return 0
+
+    saved = 0
+    for node in removed:
+        if node.action_type == 'LOAD.EFFECTOR':
+            kept = loads[effector_key(node)]
+            saved += 1
+        else:
+            kept = unloads[effector_key(node)]
+        for child in process_tree.children(node.identifier):
+            process_tree.move_node(child.identifier, kept.identifier)
+        process_tree.remove_node(node.identifier)
+
+    # the kept unload of an effector right after its kept load
+    planned = []
+    for node in order:
+        planned.append(node)
+        if node.action_type == 'LOAD.EFFECTOR':
+            unload = unloads.pop(effector_key(node), None)
+            if unload is not None:
+                planned.append(unload)
+    # unload without load in the tree
+    planned.extend(unloads.values())
+
+    # moving the nodes in the root in the planned order
+    for node in planned:
+        process_tree.move_node(node.identifier, root.identifier)
+
+    return saved
+
+
+def action_e1(action: Action) -> List[float]:
+    """ get the successive 7th axis positions of a movement action
+
+    Args:
+        action (Action): the action
+
+    Returns:
+        List[float]: the e1 of the movement points,
+            empty if the action is not a movement
+    """
+    definition = action.definition
+    if not isinstance(definition, Movement):
+        return []
+    return definition.e1s
+
+
+def e1_travel(actions: Iterable[Action]) -> float:
+    """ get the 7th axis travel of a sequence of actions
+
+    Args:
+        actions (Iterable[Action]): the actions, in sequence order
+
+    Returns:
+        float: the sum of the e1 variations between the successive
+            movement points
+    """
+    travel = 0
+    current = None
+    for action in actions:
+        for e1 in action_e1(action):
+            if current is not None:
+                travel += abs(e1 - current)
+            current = e1
+    return travel
+
+
+def minimize_station_moves(process_tree: ActionTree) -> Tuple[float, float]:
+    """ order the station movements of a same parent to minimize the
+        7th axis travel
+
+        the process tree is walked in sequence order. when a node has
+        several station movement children, they are ordered by the
+        e1 of their first point, ascending or descending, if it shortens
+        the travel from the current e1 through the children. the
+        stations keep the work order slots of the children, the other
+        children and the nodes below each station are not moved, so
+        the dependences are respected.
+
+    Args:
+        process_tree (ActionTree): the process tree,
+            without the global actions
+
+    Returns:
+        Tuple[float, float]: the e1 travel before and after the ordering
+    """
+    before = e1_travel(process_tree.iter_actions())
+
+    current = None
+    stack = [process_tree.get_node(process_tree.root)]
+    while stack:
+        node = stack.pop()
+        if node.data is not None:
+            e1s = action_e1(node.data)
+            if e1s:
+                current = e1s[-1]
+
+        children = sorted(node.iter_children(), key=node_sort_key)
+        stations = [child for child in children
+                    if child.action_type == STATION_MOVE_TYPE]
+        if len(stations) > 1:
+            children = order_stations(process_tree, node, children,
+                                      stations, current)
+        stack.extend(reversed(children))
+
+    return before, e1_travel(process_tree.iter_actions())
+
+
+def order_stations(process_tree: ActionTree,
+                   parent: ActionNode,
+                   children: List[ActionNode],
+                   stations: List[ActionNode],
+                   current: Optional[float]) -> List[ActionNode]:
+    """ order the station movements children of a node
+
+    Args:
+        process_tree (ActionTree): the process tree
+        parent (ActionNode): the node
+        children (List[ActionNode]): the node children, in sequence order
+        stations (List[ActionNode]): the station movements children
+        current (Optional[float]): the e1 before the first child
+
+    Returns:
+        List[ActionNode]: the node children in the new sequence order
+    """
+    # e1 at the entry and exit of each child subtree
+    bounds: Dict[str, Tuple[float, float]] = {}
+    for child in children:
+        e1s = [e1 for nid in process_tree.expand_tree(child.identifier,
+                                                      key=node_sort_key)
+               for e1 in action_e1(process_tree[nid].data)]
+        if e1s:
+            bounds[child.identifier] = (e1s[0], e1s[-1])
+    if any(station.identifier not in bounds for station in stations):
+        return children
+
+    def arrange(ordered: List[ActionNode]) -> List[ActionNode]:
+        # the stations in the station slots of the children
+        placed = iter(ordered)
+        return [next(placed) if child.action_type == STATION_MOVE_TYPE
+                else child for child in children]
+
+    def travel(arranged: List[ActionNode]) -> float:
+        total = 0
+        position = current
+        for child in arranged:
+            if child.identifier not in bounds:
+                continue
+            entry, exit = bounds[child.identifier]
+            if position is not None:
+                total += abs(entry - position)
+            position = exit
+        return total
+
+    ascending = sorted(stations, key=lambda s: bounds[s.identifier][0])
+    # the current order is kept on equal travel
+    best = children
+    best_travel = travel(children)
+    for ordered in (ascending, ascending[::-1]):
+        arranged = arrange(ordered)
+        arranged_travel = travel(arranged)
+        if arranged_travel < best_travel:
+            best, best_travel = arranged, arranged_travel
+
+    if best is children:
+        return children
+
+    # the stations take the work order of their slot, the children are
+    # moved in the new order for the stations with the same work order
+    slots = [node_sort_key(station) for station in stations]
+    for station, key in zip((c for c in best
+                             if c.action_type == STATION_MOVE_TYPE), slots):
+        station.sort_key = key
+    for child in best:
+        process_tree.move_node(child.identifier, parent.identifier)
+
+    return best
@@ -0,0 +1,226 @@
+from collections import Counter
+import cProfile
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from typing import Callable, Iterable, Iterator, Set
+
+# profilers available for the requests
+PROFILE_MODES = ['deterministic', 'sampling']
+
+# only one profiled step run by cProfile at a time
+_CPROFILE_LOCK = threading.Lock()
+
+
+class RequestProfiler:
+    """ class used to profile single requests on demand and write
+        their profile in a directory
+
+        when disabled no profile is opened and the requests are
+        processed as if the profiler did not exist
+
+    Attributes
+    ----------
+    enabled : bool
+        True if the requests can be profiled
+    directory : str
+        directory where the profiles are written
+    mode : str
+        'deterministic' to profile with cProfile, 'sampling' to sample
+        the request call stacks
+    sample_interval : float
+        period of the call stacks sampling (s)
+    """
+
+    def __init__(self, directory: str,
+                 enabled: bool = False,
+                 mode: str = 'deterministic',
+                 sample_interval: float = 0.001) -> 'RequestProfiler':
+        """RequestProfiler initializer
+
+        Args:
+            directory (str): directory where the profiles are written,
+                created on the first profile
+            enabled (bool, optional): allow the requests profiling.
+                Defaults to False.
+            mode (str, optional): 'deterministic' or 'sampling'.
+                Defaults to 'deterministic'.
+            sample_interval (float, optional): sampling period (s).
+                Defaults to 0.001.
+
+        Raises:
+            ValueError: if the mode is unknown
+        """
+        if mode not in PROFILE_MODES:
+            raise ValueError('unknown profile mode {mode}, expected one of '
+                             '{modes}'.format(mode=mode, modes=PROFILE_MODES))
+        self.enabled: bool = enabled
+        self.directory: str = directory
+        self.mode: str = mode
+        self.sample_interval: float = sample_interval
+
+    def open(self, request: str) -> 'RequestProfile':
+        """ open the profile of a request
+
+        Args:
+            request (str): the canonical request body
+
+        Returns:
+            RequestProfile: the request profile, None if disabled
+        """
+        if not self.enabled:
+            return None
+        return RequestProfile(self, request)
+
+
+class RequestProfile:
+    """ class used to profile the processing of a request, the
+        processing steps being run by the call and iterate methods,
+        possibly in different threads
+
+        save writes in the profiler directory :
+        - <id>.prof : the cProfile statistics (deterministic mode),
+          readable with pstats or snakeviz
+        - <id>.folded : the sampled call stacks and their count, one
+          per line, in the flame graph folded format (sampling mode)
+        - <id>.json : the profile id, mode, profiled duration and the
+          canonical request body
+
+    Attributes
+    ----------
+    id : str
+        the profile id, returned to the client
+    duration : float
+        time spent in the profiled steps (s)
+    """
+
+    def __init__(self, profiler: RequestProfiler,
+                 request: str) -> 'RequestProfile':
+        """RequestProfile initializer
+
+        Args:
+            profiler (RequestProfiler): the profiler opening the profile
+            request (str): the canonical request body
+        """
+        self.id: str = '{date}-{uid}'.format(
+            date=time.strftime('%Y%m%d-%H%M%S'), uid=uuid.uuid4().hex[:8])
+        self.duration: float = 0.0
+        self.__profiler = profiler
+        self.__request = request
+        self.__cprofile: cProfile.Profile = None
+        self.__stacks: Counter = Counter()
+        # ids of the threads running a profiled step, sampled by
+        # a thread running while this set is not empty
+        self.__threads: Set[int] = set()
+        self.__sampler: threading.Thread = None
+        self.__lock = threading.Lock()
+
+    def call(self, func: Callable, *args, **kwargs):
+        """ run a processing step under the profiler
+
+        Args:
+            func (Callable): the step function
+
+        Returns:
+            the step function result
+        """
+        start = time.perf_counter()
+        try:
+            if self.__profiler.mode == 'sampling':
+                return self.__sample(func, *args, **kwargs)
+            with _CPROFILE_LOCK:
+                if self.__cprofile is None:
+                    self.__cprofile = cProfile.Profile()
+                return self.__cprofile.runcall(func, *args, **kwargs)
+        finally:
+            self.duration += time.perf_counter() - start
+
+    def iterate(self, items: Iterable) -> Iterator:
+        """ generate the items of an iterable under the profiler,
+            the profile is saved once all the items are generated
+
+        Args:
+            items (Iterable): the items, e.g. streamed response lines
+
+        Yields:
+            the items
+        """
+        iterator = iter(items)
+        done = object()
+        while True:
+            item = self.call(next, iterator, done)
+            if item is done:
+                break
+            yield item
+        self.save()
+
+    def save(self):
+        """ write the profile and the request in the profiler directory
+        """
+        directory = self.__profiler.directory
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, self.id)
+
+        if self.__cprofile is not None:
+            self.__cprofile.dump_stats(path + '.prof')
+        if self.__profiler.mode == 'sampling':
+            with self.__lock:
+                stacks = self.__stacks.most_common()
+            with open(path + '.folded', 'w') as folded:
+                for stack, count in stacks:
+                    folded.write('{stack} {count}\n'.format(stack=stack,
+                                                            count=count))
+
+        with open(path + '.json', 'w') as description:
+            json.dump({"profileId": self.id,
+                       "mode": self.__profiler.mode,
+                       "duration": round(self.duration, 6),
+                       "request": json.loads(self.__request)},
+                      description, indent=2)
+
+    def __sample(self, func: Callable, *args, **kwargs):
+        thread_id = threading.get_ident()
+        with self.__lock:
+            self.__threads.add(thread_id)
+            if self.__sampler is None:
+                self.__sampler = threading.Thread(
+                    target=self.__sample_stacks,
+                    name='mars-profile-{id}'.format(id=self.id),
+                    daemon=True)
+                self.__sampler.start()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            with self.__lock:
+                self.__threads.discard(thread_id)
+
+    def __sample_stacks(self):
+        # count the call stacks of the threads running a profiled step,
+        # stop when no step runs
+        interval = self.__profiler.sample_interval
+        while True:
+            time.sleep(interval)
+            frames = sys._current_frames()
+            with self.__lock:
+                if not self.__threads:
+                    self.__sampler = None
+                    return
+                for thread_id in self.__threads:
+                    frame = frames.get(thread_id)
+                    if frame is not None:
+                        self.__stacks[_fold_stack(frame)] += 1
+
+
+def _fold_stack(frame) -> str:
+    # the frame call stack, from the outermost call, as
+    # file:function names separated by semicolons
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append('{file}:{name}'.format(
+            file=os.path.basename(code.co_filename), name=code.co_name))
+        frame = frame.f_back
+    return ';'.join(reversed(names))
@@ -1,7 +1,11 @@
 from typing import Dict, List
-from copy import deepcopy
 from enum import Enum, EnumMeta
 
+# the request builders share the constant parts of the requests
+# (descriptions, queries, whole program launch requests) between
+# the sequences : the generated requests must not be modified
+
+
 class ProgramCode(Enum):
     TRAJ_GEN = 1
     CHANGE_UTUF = 3
@@ -22,44 +26,112 @@ class PathCode(Enum):
     CIRCULAR = 3
 
 
-def utuf_set_request(uf, ut):
-    data = {
-        "action": Action['REQUEST'].value,
-        "target": Target['PROXY'].value,
-        "description": "send user tool and user frame informations\
-                      (NUMREG 18 et 19)",
+# registers read and write limits per request
+REGISTERS_LIMITS = {
+    "string": {
+        "read": 5,
+        "write": 5
+    },
+    "position": {
+        "read": 10,
+        "write": 10
+    },
+    "numeric": {
+        "read": 120,
+        "write": 115
+    }
+}
+
+# first registers written by the movements
+POSSETTINGS_START_REG = 20
+POSITIONS_START_REG = 1
+
+# tracker alerting for the end of the programs (value 0 on the program
+# register) and its default polling interval (ms)
+TRACKER_ID = "trackernum"
+TRACKER_INTERVAL = 1000
+
+_REQUEST = Action.REQUEST.value
+_WAIT = Action.WAIT.value
+_PROXY = Target.PROXY.value
+_HMI = Target.HMI.value
+
+_UTUF_DESCRIPTION = "send user tool and user frame informations\
+                      (NUMREG 18 et 19)"
+_UTUF_QUERY = {
+    "startReg": 18,
+    "blockSize": 2,
+    "type": "int"
+}
+_POSSETTINGS_DESCRIPTION = \
+    "send movement positions settings (speed, path, cnt)"
+_POSITION_DESCRIPTION = "set movement position parameters"
+_POSITIONS_DESCRIPTION = "set movement positions parameters"
+_HMI_DESCRIPTION = "HMI request to change tool"
+_PROGRAM_REG_QUERY = {
+    "reg": 1,
+    "type": "int"
+}
+_EMPTY_DEFINITION = {}
+
+
+def tracker_subscribe_request(interval: int = TRACKER_INTERVAL) -> Dict:
+    return {
+        "action": _REQUEST,
+        "target": _PROXY,
+        "description": "init tracker to alert for value 0 on program register (NUM REG 1)",
         "definition": {
-            "method": "PUT",
-            "api": "/numericRegister/block",
-            "query": {
-                "startReg": 18,
-                "blockSize": 2,
-                "type": "int"
-            },
+            "method": "SUBSCRIBE",
+            "api": "/numericRegister/single",
+            "query": _PROGRAM_REG_QUERY,
             "body": {
-                "data": {
-                    "values": [uf, ut]
+                "setting": {
+                    "type": "tracker",
+                    "settings": {
+                        "tracker": "alert",
+                        "value": {
+                            "value": 0
+                        },
+                        "interval": interval,
+                        "id": TRACKER_ID
+                    }
                 }
             }
         }
     }
 
-    return data
 
+def tracker_unsubscribe_request() -> Dict:
+    return {
+        "action": _REQUEST,
+        "target": _PROXY,
+        "description": "remove tracker of program register (NUM REG 1)",
+        "definition": {
+            "method": "UNSUBSCRIBE",
+            "api": "/numericRegister/single",
+            "query": _PROGRAM_REG_QUERY,
+            "body": {
+                "setting": {
+                    "type": "tracker",
+                    "settings": {
+                        "id": TRACKER_ID
+                    }
+                }
+            }
+        }
+    }
 
-def launch_program_request(program_code: ProgramCode) -> List[Dict]:
-    data = [{
-                "action": Action['REQUEST'].value,
-                "target": Target['PROXY'].value,
+
+def __program_requests(program_code: ProgramCode) -> List[Dict]:
+    return [{
+                "action": _REQUEST,
+                "target": _PROXY,
                 "description": "send program to launch : {program} (NUM REG 1)"
                               .format(program=program_code.name),
                 "definition": {
                     "method": "PUT",
                     "api": "/numericRegister/single",
-                    "query": {
-                        "reg": 1,
-                        "type": "int"
-                    },
+                    "query": _PROGRAM_REG_QUERY,
                     "body": {
                         "data": {
                             "value": program_code.value
@@ -67,125 +139,101 @@ def launch_program_request(program_code: ProgramCode) -> List[Dict]:
                         }
                     }
             },
+            tracker_subscribe_request(TRACKER_INTERVAL),
             {
-                "action": Action['REQUEST'].value,
-                "target": Target['PROXY'].value,
-                "description": "init tracker to alert for value 0 on program register (NUM REG 1)",
-                "definition": {
-                    "method": "SUBSCRIBE",
-                    "api": "/numericRegister/single",
-                    "query": {
-                        "reg": 1,
-                        "type": "int"
-                    },
-                    "body": {
-                        "setting": {
-                            "type": "tracker",
-                            "settings": {
-                                "tracker": "alert",
-                                "value": {
-                                    "value": 0
-                                },
-                                "interval": 1000,
-                                "id": "trackernum"
-                            }
-                        }
-                    }
-                }
-            },
-            {
-                "action": Action['WAIT'].value,
-                "target": Target['PROXY'].value,
+                "action": _WAIT,
+                "target": _PROXY,
                 "description": "wait program execution end",
-                "definition": {}
+                "definition": _EMPTY_DEFINITION
             }]
 
-    return data
 
+# the program launch requests never change
+_PROGRAM_REQUESTS = {code: __program_requests(code) for code in ProgramCode}
 
-def __get_registers_limit(reg_type: str, action: str) -> int:
-    max_reg = {
-        "string": {
-            "read": 5,
-            "write": 5
-        },
-        "position": {
-            "read": 10,
-            "write": 10
-        },
-        "numeric": {
-            "read": 120,
-            "write": 115
+
+def utuf_set_request(uf, ut):
+    data = {
+        "action": _REQUEST,
+        "target": _PROXY,
+        "description": _UTUF_DESCRIPTION,
+        "definition": {
+            "method": "PUT",
+            "api": "/numericRegister/block",
+            "query": _UTUF_QUERY,
+            "body": {
+                "data": {
+                    "values": [uf, ut]
+                }
+            }
         }
     }
 
-    if reg_type in max_reg and action in ['read', 'write']:
-        return max_reg[reg_type][action]
+    return data
+
+
+def launch_program_request(program_code: ProgramCode) -> List[Dict]:
+    # a new list, the sequences extend it, of the shared requests
+    return list(_PROGRAM_REQUESTS[program_code])
+
+
+def __get_registers_limit(reg_type: str, action: str) -> int:
+    if reg_type in REGISTERS_LIMITS and action in ['read', 'write']:
+        return REGISTERS_LIMITS[reg_type][action]
     else:
         raise Exception('error to get register limits')
 
 
 def __split_register_data(register_data: List[Dict or int or str],
                           limit: int) -> List[List[Dict]]:
-    sub_list = []
-    i = 0
-    step = 0
-    while i < len(register_data):
-        step += 1
-        sub_list.append(register_data[i:step*limit])
-        i += limit
-
-    return sub_list
+    return [register_data[i:i + limit]
+            for i in range(0, len(register_data), limit)]
 
 
-def possettings_set_request(pos_settings: List[int]) -> Dict or List[Dict]:
-    data = {
-        "action": Action['REQUEST'].value,
-        "target": Target['PROXY'].value,
-        "description": "send movement positions settings (speed, path, cnt)",
+def __block_request(description: str, api: str, start_reg: int,
+                    values: List, values_key: str, reg_type: str) -> Dict:
+    return {
+        "action": _REQUEST,
+        "target": _PROXY,
+        "description": description,
         "definition": {
             "method": "PUT",
-            "api": "/numericRegister/block",
+            "api": api,
             "query": {
-                "startReg": None,
-                "blockSize": None,
-                "type": "int"
+                "startReg": start_reg,
+                "blockSize": len(values),
+                "type": reg_type
             },
             "body": {
                 "data": {
-                    "values": None
+                    values_key: values
                 }
             }
         }
     }
 
+
+def possettings_set_request(pos_settings: List[int]) -> Dict or List[Dict]:
     limit = __get_registers_limit("numeric", "write")
     if len(pos_settings) > limit:
-        data_list = []
-
-        pos_settings_list = __split_register_data(pos_settings, limit)
-        i = 20
-        for ps in pos_settings_list:
-            psdata = deepcopy(data)
-            psdata['definition']['query']['startReg'] = i
-            psdata['definition']['query']['blockSize'] = len(ps)
-            psdata['definition']['body']['data']['values'] = ps
-            data_list.append(psdata)
-            i += len(ps)
-
-        return data_list
+        return [__block_request(_POSSETTINGS_DESCRIPTION,
+                                "/numericRegister/block",
+                                POSSETTINGS_START_REG + i,
+                                ps, "values", "int")
+                for i, ps in zip(range(0, len(pos_settings), limit),
+                                 __split_register_data(pos_settings, limit))]
     else:
-        data['definition']['query']['startReg'] = 20
-        data['definition']['query']['blockSize'] = len(pos_settings)
-        data['definition']['body']['data']['values'] = pos_settings
-        return data
+        return __block_request(_POSSETTINGS_DESCRIPTION,
+                               "/numericRegister/block",
+                               POSSETTINGS_START_REG,
+                               pos_settings, "values", "int")
 
 
 def position_set_request(position: Dict):
     data = {
-            "action": Action['REQUEST'].value,
-            "target": Target['PROXY'].value,
-            "description": "set movement position parameters",
+            "action": _REQUEST,
+            "target": _PROXY,
+            "description": _POSITION_DESCRIPTION,
             "definition": {
                 "method": "PUT",
                 "api": "/positionRegister/single",
@@ -205,46 +253,20 @@ def position_set_request(position: Dict):
 
 
 def positions_set_request(positions: List[Dict]):
-    data = {
-        "action": Action['REQUEST'].value,
-        "target": Target['PROXY'].value,
-        "description": "set movement positions parameters",
-        "definition": {
-            "method": "PUT",
-            "api": "/positionRegister/block",
-            "query": {
-                "startReg": None,
-                "blockSize": None,
-                "type": positions[0]['type']
-            },
-            "body": {
-                "data": {
-                    "positions": None
-                }
-            }
-        }
-    }
-
     limit = __get_registers_limit("position", "write")
+    reg_type = positions[0]['type']
     if len(positions) > limit:
-        data_list = []
-
-        pos_settings_list = __split_register_data(positions, limit)
-        i = 1
-        for ps in pos_settings_list:
-            psdata = deepcopy(data)
-            psdata['definition']['query']['startReg'] = i
-            psdata['definition']['query']['blockSize'] = len(ps)
-            psdata['definition']['body']['data']['positions'] = ps
-            data_list.append(psdata.copy())
-            i += len(ps)
-
-        return data_list
+        return [__block_request(_POSITIONS_DESCRIPTION,
+                                "/positionRegister/block",
+                                POSITIONS_START_REG + i,
+                                ps, "positions", reg_type)
+                for i, ps in zip(range(0, len(positions), limit),
+                                 __split_register_data(positions, limit))]
     else:
-        data['definition']['query']['startReg'] = 1
-        data['definition']['query']['blockSize'] = len(positions)
-        data['definition']['body']['data']['positions'] = positions
-        return data
+        return __block_request(_POSITIONS_DESCRIPTION,
+                               "/positionRegister/block",
+                               POSITIONS_START_REG,
+                               positions, "positions", reg_type)
 
 
 def ihm_maniptool_request(tool_type,
@@ -256,17 +278,17 @@ def ihm_maniptool_request(tool_type,
                        tref=tool_ref)
 
     data = [{
-        "action": Action['REQUEST'].value,
-        "target": Target['HMI'].value,
-        "description": "HMI request to change tool",
+        "action": _REQUEST,
+        "target": _HMI,
+        "description": _HMI_DESCRIPTION,
         "definition": {
             "message": message
         }},
         {
-            "action": Action['WAIT'].value,
-            "target": Target['HMI'].value,
+            "action": _WAIT,
+            "target": _HMI,
             "description": "Wait for IHM confirmation for request " + message,
-            "definition": {}
+            "definition": _EMPTY_DEFINITION
         }
     ]
 
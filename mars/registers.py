@@ -0,0 +1,171 @@
+from typing import Dict, List, Tuple
+
+import mars.proxyapi as proxyapi
+
+# numeric registers holding the user frame and user tool
+# applied by the CHANGE_UTUF program
+UTUF_REGS = (18, 19)
+# numeric register launching the programs, reset to 0 at their end
+PROGRAM_REG = 1
+
+_REQUEST = proxyapi.Action.REQUEST.value
+_WAIT = proxyapi.Action.WAIT.value
+_PROXY = proxyapi.Target.PROXY.value
+
+
+class RegisterWriteFilter:
+    """ class used to remove from a sequence the proxy requests which
+        would not change the controller state
+
+        the actions sequences are given in the sequence order. the
+        values written in the numeric and position registers are
+        followed from the start of the sequence, the registers being
+        unknown until written. a register write is removed when all the
+        written registers already hold the written values. a CHANGE_UTUF
+        program launch, with its tracker and wait, is removed when the
+        user frame and tool registers hold the values applied by the
+        previous CHANGE_UTUF launch. the other requests are kept, a
+        write on an unknown api forgets all the registers.
+
+        the requests are not modified, a filtered action sequence is a
+        copy of the action sequence with the kept requests.
+
+    Attributes
+    ----------
+    removed : int
+        number of proxy requests removed
+    """
+
+    def __init__(self) -> 'RegisterWriteFilter':
+        """RegisterWriteFilter initializer
+        """
+        self.removed: int = 0
+        # register number -> value, known registers only
+        self.__numeric: Dict[int, object] = {}
+        # register number -> (position type, position)
+        self.__positions: Dict[int, Tuple[str, Dict]] = {}
+        # user frame and tool applied by the last CHANGE_UTUF launch
+        self.__active_utuf: Tuple = None
+
+    def filter(self, action_sequence: Dict) -> Dict:
+        """ remove the redundant requests of the next action sequence
+
+        Args:
+            action_sequence (Dict): the action sequence, as generated by
+                Action.get_sequence
+
+        Returns:
+            Dict: the action sequence, a copy if requests were removed
+        """
+        requests = action_sequence['requestSequence']
+        kept = []
+        index = 0
+        while index < len(requests):
+            length = _launch_length(requests, index)
+            if length:
+                group = requests[index:index + length]
+                if self.__launch(requests[index]):
+                    kept.extend(group)
+                else:
+                    self.removed += _count_requests(group)
+                index += length
+                continue
+
+            request = requests[index]
+            if self.__write(request):
+                kept.append(request)
+            else:
+                self.removed += 1
+            index += 1
+
+        if len(kept) == len(requests):
+            return action_sequence
+        return dict(action_sequence, requestSequence=kept)
+
+    def __launch(self, request: Dict) -> bool:
+        # follow a program launch, False if it changes nothing
+        code = request['definition']['body']['data']['value']
+        if code != proxyapi.ProgramCode.CHANGE_UTUF.value:
+            return True
+
+        utuf = self.__utuf()
+        if utuf is not None and utuf == self.__active_utuf:
+            return False
+        self.__active_utuf = utuf
+        return True
+
+    def __utuf(self) -> Tuple:
+        if all(reg in self.__numeric for reg in UTUF_REGS):
+            return tuple(self.__numeric[reg] for reg in UTUF_REGS)
+        return None
+
+    def __write(self, request: Dict) -> bool:
+        # follow a request, False if it is a write changing nothing
+        if request['action'] != _REQUEST or request['target'] != _PROXY:
+            return True
+        definition = request['definition']
+        if definition.get('method') != 'PUT':
+            return True
+
+        writes = _register_writes(definition)
+        if writes is None:
+            # unknown register api, its effect can't be followed
+            self.__numeric.clear()
+            self.__positions.clear()
+            return True
+
+        kind, values = writes
+        registers = self.__numeric if kind == 'numeric' else self.__positions
+        if all(reg in registers and registers[reg] == value
+               for reg, value in values.items()):
+            return False
+        registers.update(values)
+        return True
+
+
+def _launch_length(requests: List[Dict], index: int) -> int:
+    # number of requests of the program launch starting at index :
+    # the program register write, the tracker and the wait
+    # 0 if the request does not launch a program
+    request = requests[index]
+    definition = request['definition']
+    if request['action'] != _REQUEST or definition.get('method') != 'PUT'\
+            or definition.get('api') != '/numericRegister/single'\
+            or definition['query']['reg'] != PROGRAM_REG:
+        return 0
+
+    length = 1
+    if index + length < len(requests):
+        tracker = requests[index + length]
+        if tracker['action'] == _REQUEST\
+                and tracker['definition'].get('method') == 'SUBSCRIBE'\
+                and tracker['definition']['query']['reg'] == PROGRAM_REG:
+            length += 1
+    if index + length < len(requests):
+        wait = requests[index + length]
+        if wait['action'] == _WAIT and wait['target'] == _PROXY:
+            length += 1
+    return length
+
+
+def _count_requests(requests: List[Dict]) -> int:
+    return sum(1 for request in requests if request['action'] == _REQUEST)
+
+
+def _register_writes(definition: Dict) -> Tuple[str, Dict]:
+    # registers written by a PUT request : 'numeric' or 'position' and
+    # the written values by register number, None if unknown api
+    api = definition.get('api')
+    query = definition['query']
+    data = definition['body']['data']
+    if api == '/numericRegister/block':
+        return 'numeric', {query['startReg'] + i: value
+                           for i, value in enumerate(data['values'])}
+    if api == '/numericRegister/single':
+        return 'numeric', {query['reg']: data['value']}
+    if api == '/positionRegister/block':
+        return 'position', {query['startReg'] + i: (query['type'], position)
+                            for i, position in enumerate(data['positions'])}
+    if api == '/positionRegister/single':
+        return 'position', {query['reg']: (query['type'], data['position'])}
+    return None
@@ -0,0 +1,148 @@
+from typing import Dict, Iterable, List, Set
+
+from mars.action import Action, Dependence, DependenceType
+
+# key of the downstream dependences : 9999 - the action priority
+DOWNSTREAM_KEY_BASE = 9999
+
+
+class DependenceCycleError(Exception):
+    """ exception raised when the actions dependences contain a cycle
+
+    Attributes
+    ----------
+    cycle : List[str]
+        id of the actions in the cycle, the first action being repeated
+        at the end
+    """
+
+    def __init__(self, cycle: List[str]) -> 'DependenceCycleError':
+        self.cycle: List[str] = cycle
+        super(DependenceCycleError, self).__init__(
+            "dependence cycle between the actions {cycle}"
+            .format(cycle=' -> '.join(cycle)))
+
+
+def dependence_key(dependence: Dependence) -> int:
+    """ get the scheduling key of a dependence action :
+        its priority for an upstream dependence,
+        9999 - its priority for a downstream dependence
+
+    Args:
+        dependence (Dependence): the dependence
+
+    Raises:
+        Exception: if the dependence type is unknown
+
+    Returns:
+        int: the scheduling key
+    """
+    if dependence.dependence_type == DependenceType.UPSTREAM:
+        return dependence.action.priority
+    elif dependence.dependence_type == DependenceType.DOWNSTREAM:
+        return DOWNSTREAM_KEY_BASE - dependence.action.priority
+    else:
+        raise Exception("unknow dependence type")
+
+
+class DependenceScheduler:
+    """ class used to order the dependences closure of actions
+        for their insertion in the process tree
+
+        the root action is keyed with its priority, each dependence
+        with its dependence_key, and the closure is ordered by key, then
+        in depth first order. an action reached by several paths appears
+        once, with its smallest key.
+
+        each action and dependence is visited once per root, the cycles
+        are detected once for all the roots scheduled by the scheduler.
+    """
+
+    def __init__(self) -> 'DependenceScheduler':
+        """DependenceScheduler initializer
+        """
+        # id of the actions whose closure is known without cycle
+        self.__acyclic: Set[str] = set()
+
+    def schedule(self, action: Action) -> List[Action]:
+        """ order the dependences closure of an action
+
+        Args:
+            action (Action): the root action
+
+        Raises:
+            DependenceCycleError: if the closure contains a cycle
+
+        Returns:
+            List[Action]: the action and its dependences, ordered
+        """
+        self.__check_acyclic(action)
+
+        # depth first traversal, each action keeps its first visit rank
+        # and its smallest key
+        keys: Dict[str, int] = {}
+        visited: List[Action] = []
+        stack = [(action, action.priority)]
+        while stack:
+            current, key = stack.pop()
+            known_key = keys.get(current.id)
+            if known_key is not None:
+                if key < known_key:
+                    keys[current.id] = key
+                continue
+
+            keys[current.id] = key
+            visited.append(current)
+            for dep in reversed(current.dependences):
+                stack.append((dep.action, dependence_key(dep)))
+
+        # stable bucket sort on the keys
+        buckets: Dict[int, List[Action]] = {}
+        for current in visited:
+            buckets.setdefault(keys[current.id], []).append(current)
+        return [a for key in sorted(buckets) for a in buckets[key]]
+
+    def schedule_all(self, actions: Iterable[Action]) -> List[List[Action]]:
+        """ order the dependences closure of several actions, a
+            convenience wrapper scheduling each root in turn : only the
+            cycle detection is shared by the roots, the ordered closure
+            of each root being needed whole to insert its branch
+
+        Args:
+            actions (Iterable[Action]): the root actions
+
+        Raises:
+            DependenceCycleError: if a closure contains a cycle
+
+        Returns:
+            List[List[Action]]: the ordered closure of each action
+        """
+        return [self.schedule(action) for action in actions]
+
+    def __check_acyclic(self, action: Action):
+        if action.id in self.__acyclic:
+            return
+
+        # iterative depth first search, the actions of the current path
+        # are indexed by id to find the back edges
+        path: List[str] = [action.id]
+        on_path: Dict[str, int] = {action.id: 0}
+        stack = [iter(action.dependences)]
+        while stack:
+            dep = next(stack[-1], None)
+            if dep is None:
+                stack.pop()
+                done = path.pop()
+                del on_path[done]
+                self.__acyclic.add(done)
+                continue
+
+            dep_id = dep.action.id
+            if dep_id in on_path:
+                raise DependenceCycleError(path[on_path[dep_id]:] + [dep_id])
+            if dep_id in self.__acyclic:
+                continue
+
+            on_path[dep_id] = len(path)
+            path.append(dep_id)
+            stack.append(iter(dep.action.dependences))
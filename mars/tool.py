@@ -22,6 +22,14 @@ class ToolManipulation(Definition):
         self._tool_type: str = tool_type
         self._manip: Manipulation = manipulation
 
+    @property
+    def tool_type(self) -> str:
+        return self._tool_type
+
+    @property
+    def tool_reference(self) -> str:
+        return self._tool_ref
+
     @staticmethod
     def parse(serialise_manip: Dict) -> 'ToolManipulation':
         ut = serialise_manip['ut']
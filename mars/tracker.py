@@ -0,0 +1,92 @@
+from typing import Dict
+
+import mars.proxyapi as proxyapi
+
+_REQUEST = proxyapi.Action.REQUEST.value
+
+
+class ProgramTracker:
+    """ class used to set the tracker alerting for the end of the
+        programs launched by a sequence
+
+        the actions sequences are given in the sequence order. by default
+        each program launch subscribes to its own tracker, polling the
+        program register at the tracker interval. with a persistent
+        tracker the launches do not subscribe : the tracker is subscribed
+        once at the start of the first action sequence, reused by all the
+        launches, and unsubscribed at the end of the last action sequence.
+
+        the requests are not modified, a rewritten action sequence is a
+        copy of the action sequence with new requests lists.
+
+    Attributes
+    ----------
+    interval : int
+        polling interval of the tracker (ms)
+    persistent : bool
+        True to subscribe the tracker once for the whole sequence
+    """
+
+    def __init__(self, interval: int = proxyapi.TRACKER_INTERVAL,
+                 persistent: bool = False) -> 'ProgramTracker':
+        """ProgramTracker initializer
+
+        Args:
+            interval (int, optional): polling interval of the tracker (ms).
+                Defaults to proxyapi.TRACKER_INTERVAL.
+            persistent (bool, optional): subscribe the tracker once for
+                the whole sequence. Defaults to False.
+        """
+        self.interval: int = interval
+        self.persistent: bool = persistent
+        # shared by the rewritten sequences
+        self.__subscribe: Dict = proxyapi.tracker_subscribe_request(interval)
+        self.__unsubscribe: Dict = proxyapi.tracker_unsubscribe_request()
+
+    @property
+    def rewrites(self) -> bool:
+        """ True if the sequences generated by the actions are rewritten """
+        return self.persistent or self.interval != proxyapi.TRACKER_INTERVAL
+
+    def filter(self, action_sequence: Dict, first: bool = False,
+               last: bool = False) -> Dict:
+        """ set the tracker requests of the next action sequence
+
+        Args:
+            action_sequence (Dict): the action sequence, as generated by
+                Action.get_sequence
+            first (bool, optional): True for the first action sequence of
+                the sequence. Defaults to False.
+            last (bool, optional): True for the last action sequence of
+                the sequence. Defaults to False.
+
+        Returns:
+            Dict: the action sequence, a copy if rewritten
+        """
+        if not self.rewrites:
+            return action_sequence
+
+        requests = action_sequence['requestSequence']
+        if self.persistent:
+            rewritten = [request for request in requests
+                         if not _is_tracker_subscribe(request)]
+            if first:
+                rewritten.insert(0, self.__subscribe)
+            if last:
+                rewritten.append(self.__unsubscribe)
+        else:
+            rewritten = [self.__subscribe if _is_tracker_subscribe(request)
+                         else request for request in requests]
+            if all(new is old for new, old in zip(rewritten, requests)):
+                return action_sequence
+
+        return dict(action_sequence, requestSequence=rewritten)
+
+
+def _is_tracker_subscribe(request: Dict) -> bool:
+    if request['action'] != _REQUEST:
+        return False
+    definition = request['definition']
+    return definition.get('method') == 'SUBSCRIBE'\
+        and definition['body']['setting']['settings'].get('id')\
+        == proxyapi.TRACKER_ID
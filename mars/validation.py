@@ -0,0 +1,203 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+import fastjsonschema
+
+
+class ValidatorRegistry:
+    """ class used to compile once and serve the json schema validators
+        defined under the 'schemas' key of the validation schema file
+
+    Attributes
+    ----------
+    schema_file : str
+        path of the validation schema file
+    cache_dir : str or None
+        directory used to store the generated validators source code,
+        no disk cache if None
+    """
+
+    def __init__(self, schema_file: str,
+                 cache_dir: Optional[str] = None,
+                 reload_interval: float = 1.0) -> 'ValidatorRegistry':
+        """ValidatorRegistry initializer
+
+        Args:
+            schema_file (str): path of the validation schema file
+            cache_dir (str, optional): directory used to cache the
+                generated validators source. Defaults to None.
+            reload_interval (float, optional): minimum delay in seconds
+                between two checks of the schema file modification.
+                Defaults to 1.0.
+        """
+        self.__schema_file: str = schema_file
+        self.__cache_dir: Optional[str] = cache_dir
+        self.__reload_interval: float = reload_interval
+        self.__validators: Dict[str, Callable] = {}
+        self.__stats: Dict[str, Dict] = {}
+        self.__mtime: float = 0
+        self.__last_check: float = 0
+        self.__lock = threading.Lock()
+
+        self.load()
+
+    @property
+    def schema_file(self) -> str:
+        return self.__schema_file
+
+    @property
+    def cache_dir(self) -> Optional[str]:
+        return self.__cache_dir
+
+    @property
+    def names(self):
+        """ get the names of the compiled schemas
+
+        Returns:
+            List[str]: list of schema names
+        """
+        return list(self.__validators.keys())
+
+    def load(self):
+        """ read the schema file and compile all the schemas it defines
+        """
+        mtime = os.stat(self.__schema_file).st_mtime
+
+        with open(self.__schema_file, 'r') as schfile:
+            schemas = json.load(schfile)['schemas']
+
+        validators = {}
+        for name, desc in schemas.items():
+            validators[name] = self.__compile(name, desc['schema'])
+
+        # swap the validators in one operation
+        # so a concurrent request never see a partial registry
+        with self.__lock:
+            self.__validators = validators
+            self.__mtime = mtime
+            self.__last_check = time.monotonic()
+            for name in validators:
+                self.__stats.setdefault(name, {"count": 0,
+                                               "total": 0.0,
+                                               "max": 0.0})
+
+    def reload_if_changed(self):
+        """ reload the schemas if the schema file has been modified
+        since the last load. The file is checked at most once per
+        reload interval.
+        """
+        now = time.monotonic()
+        if now - self.__last_check < self.__reload_interval:
+            return
+        self.__last_check = now
+
+        try:
+            mtime = os.stat(self.__schema_file).st_mtime
+        except FileNotFoundError:
+            # keep the last valid registry
+            return
+
+        if mtime != self.__mtime:
+            self.load()
+
+    def get(self, name: str) -> Callable:
+        """ get the compiled validator for a schema
+
+        Args:
+            name (str): schema name
+
+        Raises:
+            KeyError: if no schema with this name
+
+        Returns:
+            Callable: the validation function
+        """
+        self.reload_if_changed()
+        return self.__validators[name]
+
+    def validate(self, name: str, data: object) -> object:
+        """ validate data against a schema and record the validation time
+
+        Args:
+            name (str): schema name
+            data (object): data to validate
+
+        Raises:
+            fastjsonschema.JsonSchemaException: if data not valid
+
+        Returns:
+            object: the validated data
+        """
+        validator = self.get(name)
+
+        start = time.perf_counter()
+        try:
+            return validator(data)
+        finally:
+            elapsed = time.perf_counter() - start
+            # the requests are validated by several threads
+            with self.__lock:
+                stats = self.__stats[name]
+                stats['count'] += 1
+                stats['total'] += elapsed
+                if elapsed > stats['max']:
+                    stats['max'] = elapsed
+
+    def stats(self) -> Dict[str, Dict]:
+        """ get the validation time statistics per schema
+
+        Returns:
+            Dict[str, Dict]: count, total and max validation time
+                in seconds for each schema
+        """
+        with self.__lock:
+            return {name: dict(st) for name, st in self.__stats.items()}
+
+    def __compile(self, name: str, schema: Dict) -> Callable:
+        if not self.__cache_dir:
+            return fastjsonschema.compile(schema)
+
+        # the cache entry depends on the schema content
+        # and on the fastjsonschema version generating the code
+        schema_str = json.dumps(schema, sort_keys=True)
+        digest = hashlib.sha1((fastjsonschema.VERSION + schema_str)
+                              .encode('utf-8')).hexdigest()
+        cache_path = os.path.join(self.__cache_dir,
+                                  '{name}_{digest}.py'
+                                  .format(name=name, digest=digest[:16]))
+
+        if os.path.exists(cache_path):
+            with open(cache_path, 'r') as cfile:
+                code = cfile.read()
+        else:
+            code = fastjsonschema.compile_to_code(schema)
+            os.makedirs(self.__cache_dir, exist_ok=True)
+            # write in a temporary file and rename
+            # to avoid concurrent workers reading a partial file
+            tmp_path = cache_path + '.{pid}.tmp'.format(pid=os.getpid())
+            with open(tmp_path, 'w') as cfile:
+                cfile.write(code)
+            os.replace(tmp_path, cache_path)
+
+        return _load_validator(code)
+
+
+def _load_validator(code: str) -> Callable:
+    """ execute a generated validator source and get the root function
+
+    Args:
+        code (str): source generated by fastjsonschema.compile_to_code
+
+    Returns:
+        Callable: the validation function
+    """
+    # the root validation function is the first one generated
+    func_name = re.search(r'^def (\w+)\(', code, re.MULTILINE).group(1)
+    namespace = {}
+    exec(code, namespace)
+    return namespace[func_name]